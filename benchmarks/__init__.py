@@ -0,0 +1,32 @@
+import os
+import json
+import hashlib
+import datetime
+import tempfile
+
+LEAGUE_KEY = "nba.l.64384"
+START_DATE = datetime.date(2020, 12, 21)
+WEEK = 5
+
+def league_fixtures(path, league_key=LEAGUE_KEY, start_date=START_DATE,
+                    week=WEEK):
+    # Mirrors nba_matchup.replay.fixture_path, which cannot be imported before
+    # the replay environment is set up.
+    key = ['yfs', 'get_leagues', [[league_key]], {}]
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+    content = json.dumps({'fantasy_content': {'leagues': {'0': {'league': [{
+        'start_date': start_date.isoformat(),
+        'current_week': week,
+    }]}}}})
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, digest + '.json'), 'w') as fp:
+        json.dump({'key': key, 'url': None, 'status_code': 200, 'headers': {},
+                   'content': content}, fp)
+    today = start_date + datetime.timedelta(days=7 * (week - 1) + 3)
+    with open(os.path.join(path, 'session.json'), 'w') as fp:
+        json.dump({'today': today.isoformat()}, fp)
+
+if 'NBA_MATCHUP_HTTP' not in os.environ:
+    os.environ['NBA_MATCHUP_HTTP'] = 'replay'
+    os.environ['NBA_MATCHUP_FIXTURES'] = tempfile.mkdtemp(prefix='nba_matchup_bench_')
+    league_fixtures(os.environ['NBA_MATCHUP_FIXTURES'])
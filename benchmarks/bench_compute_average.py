@@ -0,0 +1,51 @@
+import timeit
+import numpy as np
+import pandas as pd
+import click
+
+from nba_matchup.sim import CATS, compute_average
+
+from .synthetic import synthetic_game_logs
+
+def reference_compute_average(team_stats, decay_rate=0.1):
+    team_stats["Weight"] = np.exp(-decay_rate * team_stats["Days Ago"])
+    grouped = team_stats.groupby("Name")
+    def mean_func(x):
+        normed_weights = x['Weight'] / x['Weight'].sum()
+        mean = x[CATS].mul(normed_weights, axis=0).sum()
+        mean['TFGM'] = mean['FGM'] * len(normed_weights)
+        mean['TFGA'] = mean['FGA'] * len(normed_weights)
+        mean['TFTM'] = mean['FTM'] * len(normed_weights)
+        mean['TFTA'] = mean['FTA'] * len(normed_weights)
+        return mean
+    def std_func(x):
+        data = x[CATS]
+        normed_weights = x['Weight'] / x['Weight'].sum()
+        mean = data.mul(x["Weight"], axis=0)
+        deviation = (data.sub(mean, axis=1) ** 2).mul(x["Weight"], axis=0).sum(axis=0)
+        N = deviation.shape[0]
+        return np.sqrt(deviation / (N / (N - 1) * x["Weight"].sum()))
+    mean = grouped.apply(mean_func)
+    std = grouped.apply(std_func)
+    return mean, std
+
+@click.command()
+@click.option('--num_days', type=int, default=30)
+@click.option('--decay_rate', type=float, default=np.log(2) / 14)
+@click.option('--repeat', type=int, default=20)
+def main(num_days, decay_rate, repeat):
+    for scale, num_players in [("roster", 14), ("league", 12 * 14)]:
+        stats = synthetic_game_logs(num_players, num_days=num_days)
+        mean, std = compute_average(stats, decay_rate=decay_rate)
+        ref_mean, ref_std = reference_compute_average(stats.copy(), decay_rate=decay_rate)
+        pd.testing.assert_frame_equal(mean, ref_mean[mean.columns], check_names=False)
+        pd.testing.assert_frame_equal(std, ref_std[std.columns], check_names=False)
+        new = min(timeit.repeat(lambda: compute_average(stats, decay_rate=decay_rate),
+                                number=1, repeat=repeat))
+        old = min(timeit.repeat(lambda: reference_compute_average(stats.copy(), decay_rate=decay_rate),
+                                number=1, repeat=repeat))
+        print("%s (%u players, %u games): groupby %.2fms, vectorized %.2fms, %.1fx" % (
+            scale, num_players, len(stats), old * 1e3, new * 1e3, old / new))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import json
+import timeit
+import tracemalloc
+import numpy as np
+import click
+from tabulate import tabulate
+
+from nba_matchup import (simulate_h2h, projected_stats, score_teams,
+                         compute_average, hill_climb, simulated_annealing,
+                         brute_force, H2HScorer, SampleBank, AdaptiveScore,
+                         MetricScore, CompactRoster, AnalyticScorer,
+                         AnalyticScore, league_matrix, TradeState,
+                         TradeSearch, simulate_season, rank_pickups,
+                         starter_sets)
+from nba_matchup.sim import fit_roster, week_start
+
+from . import WEEK
+from .synthetic import synthetic_league, synthetic_game_logs
+
+def consume(iterator):
+    for _ in iterator:
+        pass
+
+def search_trades(state, max_size):
+    with TradeSearch(state, processes=1) as search:
+        return search.search(max_size=max_size)
+
+def fitted_team(roster):
+    mean, std, _ = fit_roster(roster, week_start(WEEK))
+    return (mean, std), set(mean.index)
+
+def bank_score(opponent, num_samples):
+    return MetricScore(H2HScorer(opponent, week=WEEK, num_samples=num_samples,
+                                 sample_bank=SampleBank(num_samples)))
+
+def setup_compute_average(num_players):
+    stats = synthetic_game_logs(num_players)
+    return lambda: compute_average(stats), num_players
+
+def setup_random_swap(roster_size, compact=False):
+    roster, _ = synthetic_league(num_teams=2, roster_size=roster_size)
+    if compact:
+        roster = CompactRoster.from_roster(roster)
+    return lambda: [roster.random_swap() for _ in range(100)], 100
+
+def setup_projected_stats(roster_size, num_samples, dtype):
+    roster, _ = synthetic_league(num_teams=2, roster_size=roster_size)
+    team, starters = fitted_team(roster)
+    return (lambda: projected_stats(team, starters, num_samples=num_samples, dtype=dtype),
+            num_samples * roster_size)
+
+def setup_score_teams(roster_size, num_samples):
+    roster, _ = synthetic_league(num_teams=2, roster_size=roster_size)
+    team, starters = fitted_team(roster)
+    scores = [projected_stats(team, starters, num_samples=num_samples)[0][:, :10]
+              for _ in range(2)]
+    return lambda: score_teams(*scores), num_samples
+
+def setup_simulate_h2h(roster_size, num_samples):
+    roster, opponent = synthetic_league(num_teams=2, roster_size=roster_size)
+    return lambda: simulate_h2h(roster, opponent, week=WEEK, num_samples=num_samples), 1
+
+def setup_search(search, roster_size, num_samples, num_steps, score_type=MetricScore,
+                 num_proposals=1):
+    roster, opponent = synthetic_league(num_teams=2, roster_size=roster_size)
+    score = score_type(bank_score(opponent, num_samples).scorer)
+    return (lambda: consume(search(roster, score, num_steps=num_steps,
+                                   num_proposals=num_proposals)),
+            num_proposals * num_steps + 1)
+
+def setup_analytic_score(roster_size):
+    roster, opponent = synthetic_league(num_teams=2, roster_size=roster_size)
+    analytic = AnalyticScore(AnalyticScorer(opponent, week=WEEK))
+    return lambda: [analytic(roster) for _ in range(100)], 100
+
+def setup_brute_force(roster_size, num_samples):
+    roster, opponent = synthetic_league(num_teams=2, roster_size=roster_size)
+    score = bank_score(opponent, num_samples)
+    num_lineups = sum(1 for _ in starter_sets(
+        [p for p in roster if roster.positions[p] != 'IL']))
+    return lambda: consume(brute_force(roster, score)), num_lineups
+
+def setup_league_matrix(roster_size, num_samples):
+    league = synthetic_league(num_teams=12, roster_size=roster_size)
+    return (lambda: league_matrix(league, week=WEEK, num_samples=num_samples),
+            len(league) * (len(league) - 1) // 2)
+
+def setup_simulate_season(roster_size, num_weeks, num_seasons):
+    schedule = [np.roll(np.arange(12), shift) for shift in range(1, num_weeks + 1)]
+    league = synthetic_league(num_teams=12, roster_size=roster_size,
+                              week_length=7 * num_weeks)
+    return (lambda: simulate_season(league, schedule, week=WEEK, num_seasons=num_seasons),
+            num_seasons)
+
+def setup_trade_search(roster_size, max_size):
+    league = synthetic_league(num_teams=12, roster_size=roster_size)
+    state = TradeState(league, 0, week=WEEK)
+    num_trades = sum(1 for partner in range(1, len(league))
+                     for _ in state.packages(partner, max_size=max_size))
+    return lambda: search_trades(state, max_size), num_trades
+
+def setup_rank_pickups(roster_size, num_samples):
+    league = synthetic_league(num_teams=12, roster_size=roster_size)
+    agents = [player for roster in league[2:] for player in roster.players]
+    return (lambda: rank_pickups(league[0], agents, league[1], week=WEEK,
+                                 num_samples=num_samples),
+            len(agents) * len(league[0].players))
+
+def benchmarks(num_samples_list, roster_sizes, num_steps):
+    for num_players in [14, 12 * 14]:
+        yield ('compute_average', {'players': num_players},
+               lambda num_players=num_players: setup_compute_average(num_players),
+               'players')
+    for roster_size in roster_sizes:
+        yield ('random_swap', {'roster_size': roster_size},
+               lambda roster_size=roster_size: setup_random_swap(roster_size), 'swaps')
+        yield ('random_swap_compact', {'roster_size': roster_size},
+               lambda roster_size=roster_size: setup_random_swap(roster_size, compact=True),
+               'swaps')
+        for num_samples in num_samples_list:
+            params = {'roster_size': roster_size, 'num_samples': num_samples}
+            for dtype in [np.float64, np.float32]:
+                yield ('projected_stats', dict(params, dtype=dtype.__name__),
+                       lambda roster_size=roster_size, num_samples=num_samples, dtype=dtype:
+                       setup_projected_stats(roster_size, num_samples, dtype),
+                       'samples')
+            yield ('score_teams', params,
+                   lambda roster_size=roster_size, num_samples=num_samples:
+                   setup_score_teams(roster_size, num_samples), 'samples')
+            yield ('simulate_h2h', params,
+                   lambda roster_size=roster_size, num_samples=num_samples:
+                   setup_simulate_h2h(roster_size, num_samples), 'lineups')
+            for name, search, score_type, num_proposals in [
+                    ('hill_climb', hill_climb, MetricScore, 1),
+                    ('simulated_annealing', simulated_annealing, MetricScore, 1),
+                    ('hill_climb_adaptive', hill_climb, AdaptiveScore, 1),
+                    ('hill_climb_batched', hill_climb, MetricScore, 8)]:
+                search_params = dict(params, num_steps=num_steps)
+                if num_proposals > 1:
+                    search_params['num_proposals'] = num_proposals
+                yield (name, search_params,
+                       lambda search=search, roster_size=roster_size,
+                       num_samples=num_samples, score_type=score_type,
+                       num_proposals=num_proposals:
+                       setup_search(search, roster_size, num_samples, num_steps,
+                                    score_type=score_type, num_proposals=num_proposals),
+                       'lineups')
+        yield ('analytic_score', {'roster_size': roster_size},
+               lambda roster_size=roster_size: setup_analytic_score(roster_size), 'lineups')
+        num_samples = min(num_samples_list)
+        yield ('brute_force', {'roster_size': roster_size, 'num_samples': num_samples},
+               lambda roster_size=roster_size: setup_brute_force(roster_size, num_samples),
+               'lineups')
+    roster_size = min(roster_sizes)
+    for num_samples in num_samples_list:
+        yield ('league_matrix', {'teams': 12, 'num_samples': num_samples},
+               lambda num_samples=num_samples: setup_league_matrix(roster_size, num_samples),
+               'matchups')
+    yield ('simulate_season', {'teams': 12, 'weeks': 10, 'seasons': 1000},
+           lambda: setup_simulate_season(roster_size, 10, 1000), 'seasons')
+    yield ('trade_search', {'teams': 12, 'max_size': 1},
+           lambda: setup_trade_search(roster_size, 1), 'trades')
+    yield ('rank_pickups', {'agents': 10 * roster_size, 'num_samples': min(num_samples_list)},
+           lambda: setup_rank_pickups(roster_size, min(num_samples_list)), 'pickups')
+
+def measure(func, repeat):
+    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+def key(result):
+    return result['name'], json.dumps(result['params'], sort_keys=True)
+
+@click.command()
+@click.option('--num_samples', type=int, multiple=True, default=[1000, 10000, 50000])
+@click.option('--roster_size', type=int, multiple=True, default=[13, 15])
+@click.option('--num_steps', type=int, default=50)
+@click.option('--repeat', type=int, default=3)
+@click.option('--only', type=str, multiple=True)
+@click.option('--save', type=click.Path(), default=None)
+@click.option('--compare', type=click.Path(exists=True), default=None)
+def main(num_samples, roster_size, num_steps, repeat, only, save, compare):
+    np.random.seed(0)
+    results = []
+    for name, params, setup, unit in benchmarks(num_samples, roster_size, num_steps):
+        if only and name not in only:
+            continue
+        func, work = setup()
+        seconds, peak = measure(func, repeat)
+        results.append({
+            'name': name, 'params': params, 'seconds': seconds,
+            'throughput': None if work is None else work / seconds,
+            'unit': unit, 'peak_mb': peak,
+        })
+    baseline = {}
+    if compare is not None:
+        with open(compare) as fp:
+            baseline = {key(r): r for r in json.load(fp)}
+    table = []
+    for result in results:
+        row = [result['name'],
+               ", ".join("%s=%s" % kv for kv in sorted(result['params'].items())),
+               "%.4f" % result['seconds'],
+               "-" if result['throughput'] is None else
+               "%.1f %s/s" % (result['throughput'], result['unit']),
+               "%.1f" % result['peak_mb']]
+        if compare is not None:
+            old = baseline.get(key(result))
+            row.append("-" if old is None else "%.2fx" % (old['seconds'] / result['seconds']))
+        table.append(row)
+    headers = ["benchmark", "params", "seconds", "throughput", "peak MB"]
+    if compare is not None:
+        headers.append("speedup")
+    print(tabulate(table, headers=headers))
+    if save is not None:
+        with open(save, 'w') as fp:
+            json.dump(results, fp, indent=2)
+
+if __name__ == "__main__":
+    main()
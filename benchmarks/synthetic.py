@@ -0,0 +1,117 @@
+import datetime
+import numpy as np
+import pandas as pd
+
+from nba_matchup import Player, Roster, START_DATE
+from nba_matchup.sim import CATS, week_start
+from nba_matchup.stats import Stats, STATS
+
+POSITIONS = {
+    'PG': {'PG', 'G', 'Util'},
+    'SG': {'SG', 'G', 'Util'},
+    'G': {'PG', 'SG', 'G', 'Util'},
+    'SF': {'SF', 'F', 'Util'},
+    'PF': {'PF', 'F', 'Util'},
+    'F': {'SF', 'PF', 'F', 'Util'},
+    'C': {'C', 'Util'},
+    'Wing': {'SG', 'SF', 'G', 'F', 'Util'},
+    'Big': {'PF', 'C', 'F', 'Util'},
+}
+STARTING_POSITIONS = ['PG', 'SG', 'G', 'SF', 'PF', 'F', 'C', 'Big', 'Wing', 'G']
+SLOTS = ['PG', 'SG', 'G', 'SF', 'PF', 'F', 'C', 'C', 'Util', 'Util']
+
+# Per-minute rates for FGA, FTA, 3PTM, REB, AST, ST, BLK, TO by archetype.
+RATES = {
+    'guard': [0.45, 0.12, 0.07, 0.12, 0.20, 0.035, 0.010, 0.07],
+    'wing': [0.42, 0.12, 0.06, 0.18, 0.10, 0.030, 0.015, 0.05],
+    'big': [0.38, 0.15, 0.02, 0.32, 0.07, 0.025, 0.045, 0.05],
+}
+ARCHETYPES = {
+    'PG': 'guard', 'SG': 'guard', 'G': 'guard', 'SF': 'wing', 'PF': 'big',
+    'F': 'wing', 'C': 'big', 'Wing': 'wing', 'Big': 'big',
+}
+
+def synthetic_games(rng, archetype, base_date, num_days=30, minutes=None):
+    if minutes is None:
+        minutes = rng.uniform(18, 36)
+    fga_rate, fta_rate, tpm_rate, reb_rate, ast_rate, st_rate, blk_rate, to_rate = RATES[archetype]
+    fg_pct = rng.uniform(0.42, 0.58) if archetype == 'big' else rng.uniform(0.40, 0.50)
+    ft_pct = rng.uniform(0.60, 0.75) if archetype == 'big' else rng.uniform(0.75, 0.92)
+    games = {}
+    for days_ago in range(1, num_days + 1):
+        if rng.rand() < 0.5:
+            continue
+        played = max(rng.normal(minutes, 5), 4)
+        fga = rng.poisson(fga_rate * played)
+        fta = rng.poisson(fta_rate * played)
+        fgm = rng.binomial(fga, fg_pct)
+        ftm = rng.binomial(fta, ft_pct)
+        tpm = min(rng.poisson(tpm_rate * played), fgm)
+        stats = {stat: 0. for stat in STATS}
+        stats.update({
+            'MP': played, 'FGA': fga, 'FGM': fgm, 'FTA': fta, 'FTM': ftm,
+            '3PTM': tpm, 'PTS': 2 * fgm + tpm + ftm,
+            'REB': rng.poisson(reb_rate * played),
+            'AST': rng.poisson(ast_rate * played),
+            'ST': rng.poisson(st_rate * played),
+            'BLK': rng.poisson(blk_rate * played),
+            'TO': rng.poisson(to_rate * played),
+            'GP': 1.,
+        })
+        games[base_date - datetime.timedelta(days=days_ago)] = Stats(
+            {k: float(v) for k, v in stats.items()})
+    return games
+
+def synthetic_player(rng, index, position, base_date, num_days=30,
+                     week_length=7, injured_rate=0.05):
+    nba_team = rng.randint(30)
+    schedule = {base_date + datetime.timedelta(days=d) for d in range(week_length)
+                if rng.rand() < 0.5}
+    player = Player(
+        'nba.p.%u' % index, str(index), 'Player %u' % index,
+        'INJ' if rng.rand() < injured_rate else None,
+        'Team %u' % nba_team, 'nba.t.%u' % nba_team,
+        set(POSITIONS[position]), 'BN',
+    )
+    player.set_stats((synthetic_games(rng, ARCHETYPES[position], base_date,
+                                      num_days=num_days), schedule))
+    return player
+
+def assign_starters(players):
+    positions = {p: 'BN' for p in players}
+    for slot in SLOTS:
+        for player in players:
+            if positions[player] == 'BN' and slot in player.eligible_positions:
+                positions[player] = slot
+                break
+    return positions
+
+def synthetic_roster(rng, roster_size=13, week=5, num_days=30, offset=0,
+                     week_length=7):
+    base_date = week_start(week)
+    positions = STARTING_POSITIONS + list(rng.choice(
+        sorted(POSITIONS), max(roster_size - len(STARTING_POSITIONS), 0)))
+    players = [synthetic_player(rng, offset + i, position, base_date,
+                                num_days=num_days, week_length=week_length)
+               for i, position in enumerate(positions[:roster_size])]
+    return Roster(players, assign_starters(players))
+
+def synthetic_league(num_teams=12, roster_size=13, week=5, num_days=30, seed=0,
+                     week_length=7):
+    rng = np.random.RandomState(seed)
+    return [synthetic_roster(rng, roster_size=roster_size, week=week,
+                             num_days=num_days, offset=i * roster_size,
+                             week_length=week_length)
+            for i in range(num_teams)]
+
+def synthetic_game_logs(num_players, num_days=30, seed=0):
+    rng = np.random.RandomState(seed)
+    base_date = START_DATE + datetime.timedelta(days=7 * 4)
+    rows = []
+    for i in range(num_players):
+        archetype = sorted(RATES)[i % len(RATES)]
+        for date, stats in synthetic_games(rng, archetype, base_date,
+                                           num_days=num_days).items():
+            rows.append(["Player %u" % i, (base_date - date).days] +
+                        [stats[c] for c in CATS])
+    return pd.DataFrame(rows, columns=["Name", "Days Ago"] + CATS)
@@ -10,18 +10,9 @@ from tabulate import tabulate
 import logging
 logging.basicConfig()
 logging.getLogger().setLevel(logging.INFO)
-from nba_matchup import get_league, simulate_h2h, CURRENT_WEEK, hill_climb, visualize_matchup, get_free_agents, simulated_annealing
+from nba_matchup import get_league, simulate_h2h, CURRENT_WEEK, hill_climb, visualize_matchup, get_free_agents, simulated_annealing, SampleBank, H2HScorer, AdaptiveScore, MetricScore, CompactRoster, CachedScore, AnalyticScorer, AnalyticScore, confirm
 league = get_league()
 
-def winning_prob(cats, points, scores, num_samples):
-    unique, nums = np.unique(points, return_counts=True)
-    counts = defaultdict(int)
-    counts.update(dict(zip(unique, nums)))
-    return sum([counts[p] for p in range(5, 10)]) / num_samples
-
-def ev(cats, points, scores, num_samples):
-    return points.mean()
-
 def print_roster(roster):
     print(tabulate([
         [position, player.name] for player, position in
@@ -41,8 +32,19 @@ def print_roster(roster):
 @click.option('--half_life', type=float, default=14)
 @click.option('--metric', type=str, default='winning_probability')
 @click.option('--ignore_injured', is_flag=True)
+@click.option('--sample_bank/--no_sample_bank', default=True)
+@click.option('--adaptive/--no-adaptive', default=False)
+@click.option('--batch_size', type=int, default=2000)
+@click.option('--sample_budget', type=int, default=None)
+@click.option('--num_proposals', type=int, default=1)
+@click.option('--cache_size', type=int, default=10000)
+@click.option('--analytic', is_flag=True)
+@click.option('--verify/--no_verify', default=True)
+@click.option('--dtype', type=click.Choice(['float64', 'float32', 'int16']), default='float64')
 def main(team1, team2, num_days, num_samples, week, num_fa, num_minimax, num_iters,
-         ignore_player, half_life, metric, ignore_injured):
+         ignore_player, half_life, metric, ignore_injured, sample_bank,
+         adaptive, batch_size, sample_budget, num_proposals,
+         cache_size, analytic, verify, dtype):
     league = get_league()
     decay_rate = np.log(2) / half_life
     if team1 is None:
@@ -57,55 +59,76 @@ def main(team1, team2, num_days, num_samples, week, num_fa, num_minimax, num_ite
                                             team2.manager_name), font='banner',
                           width=160)
     pyfiglet.print_figlet("Week %u" % week, font='big')
-    if metric == 'ev':
-        metric_fn = ev
-    else:
-        metric_fn = winning_prob
+    metric_name = 'ev' if metric == 'ev' else 'winning_probability'
+    dtype = np.dtype(dtype).type
+    bank = SampleBank(num_samples, dtype=dtype) if sample_bank or adaptive else None
     old_team1_roster = team1.roster(week=week)
     old_team2_roster = team2.roster(week=week)
-    def team1_score(roster):
-        cats, points, scores, _ = simulate_h2h(roster,
-                            team2.roster(week=week),
-                            num_days=num_days, num_samples=num_samples,
-                            week=week, decay_rate=decay_rate)
-        return metric_fn(cats, points, scores, num_samples)
-    def team2_score(roster):
-        cats, points, scores, _ = simulate_h2h(roster,
-                            team1.roster(week=week),
-                            num_days=num_days, num_samples=num_samples,
-                            week=week, decay_rate=decay_rate)
-        return metric_fn(cats, points, scores, num_samples)
-    print("%s's roster:" % team1.manager_name, team1_score(old_team1_roster))
+    def monte_carlo_score(opponent_roster):
+        return MetricScore(H2HScorer(opponent_roster,
+                                     num_days=num_days, num_samples=num_samples,
+                                     week=week, decay_rate=decay_rate,
+                                     sample_bank=bank, dtype=dtype), metric=metric_name)
+    def roster_score(opponent_roster):
+        if analytic:
+            score = AnalyticScore(AnalyticScorer(opponent_roster, week=week,
+                                                 num_days=num_days,
+                                                 decay_rate=decay_rate),
+                                  metric=metric_name)
+        elif adaptive:
+            score = AdaptiveScore(H2HScorer(opponent_roster,
+                                            num_days=num_days, num_samples=num_samples,
+                                            week=week, decay_rate=decay_rate,
+                                            sample_bank=bank, dtype=dtype),
+                                  metric=metric_name,
+                                  batch_size=batch_size, budget=sample_budget)
+        else:
+            score = monte_carlo_score(opponent_roster)
+        return CachedScore(score, max_size=cache_size,
+                           params=(week, num_days, decay_rate, num_samples))
+    print("%s's roster:" % team1.manager_name, roster_score(old_team2_roster)(old_team1_roster))
     print_roster(old_team1_roster)
-    print("%s's roster:" % team2.manager_name, team2_score(old_team2_roster))
+    print("%s's roster:" % team2.manager_name, roster_score(old_team1_roster)(old_team2_roster))
     print_roster(old_team2_roster)
     print("Adding free agents:")
     for agent in get_free_agents(num_fa):
         print(agent.name)
         old_team1_roster = old_team1_roster.add(agent, "BN")
         # old_team2_roster = old_team2_roster.add(agent, "BN")
-    team1.set_roster(old_team1_roster)
-    team2.set_roster(old_team2_roster)
+    team1.set_roster(old_team1_roster, week=week)
+    team2.set_roster(old_team2_roster, week=week)
     print("Ignoring players:", ", ".join(ignore_player))
     for i in range(num_minimax):
-        for team, score_fn in zip([team2, team1], [team2_score, team1_score]):
-            roster = team.roster(week=week)
+        for team, opponent in zip([team2, team1], [team1, team2]):
+            roster = start_roster = CompactRoster.from_roster(team.roster(week=week))
+            score_fn = roster_score(opponent.roster(week=week))
             print("===========================================")
             print("Minimax[%u]: %s" % (i + 1, team.manager_name))
             for roster, score in simulated_annealing(roster, score_fn, ignore_players={roster.player_by_name(n) for n in ignore_player},
                                             num_steps=num_iters,
-                                            ignore_injured=ignore_injured):
+                                            ignore_injured=ignore_injured,
+                                            num_proposals=num_proposals):
                 pass
+            if analytic and verify:
+                print("Analytic score:", score)
+                roster, score = confirm(monte_carlo_score(opponent.roster(week=week)),
+                                        roster, start_roster)
+                print("Monte Carlo score:", score)
+            if adaptive and not analytic:
+                print("Spent %.0f samples per candidate (budget %u)" % (
+                    score_fn.samples_spent / max(score_fn.score.num_evaluations, 1),
+                    score_fn.score.budget))
+            print("Score cache:", score_fn)
             print("%s's optimized roster:" % team.manager_name, score)
             print(tabulate([
                 [position, player.name] for player, position in
                 roster.positions.items() if position not in {"BN", "IL"}
             ]))
-            team.set_roster(roster)
+            team.set_roster(roster, week=week)
 
     projections = visualize_matchup([team1], team2,
                       num_days=num_days, num_samples=100000,
-                      week=week, decay_rate=decay_rate,
+                      week=week, decay_rate=decay_rate, dtype=dtype,
                                     show_plots=False)
     with pd.option_context('display.max_rows', None, 'display.max_columns',
                            None, 'display.expand_frame_repr', False):
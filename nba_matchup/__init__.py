@@ -4,6 +4,14 @@ from .player import *
 from .stats import *
 from .league import *
 from .sim import *
+from .analytic import *
+from .daily import *
 from .opt import *
+from .pool import *
+from .trades import *
+from .season import *
 from .util import *
 from .free_agents import *
+from .pickups import *
+from .store import *
+from .fetch import *
@@ -0,0 +1,130 @@
+import numpy as np
+import scipy.special as sp
+from nba_matchup import CURRENT_WEEK
+
+from .sim import fit_players, starter_index, week_start, CATEGORY_NAMES
+
+__all__ = ['analytic_h2h', 'AnalyticScorer', 'AnalyticScore',
+           'player_moments', 'team_moments', 'totals_moments',
+           'category_probabilities', 'points_distribution']
+
+COUNTING_CATS = ['3PTM', 'PTS', 'REB', 'AST', 'ST', 'BLK', 'TO']
+
+MOMENTS_CACHE = {}
+MOMENTS_SIZE = 10 + 2 * len(COUNTING_CATS)
+
+def shot_moments(model, attempts, total_made, total_attempts):
+    games = model.num_games
+    mean = model.mean[attempts] * games
+    variance = (model.std[attempts] * games) ** 2
+    alpha = 1. + model.mean[total_made]
+    beta = 1. + model.mean[total_attempts] - model.mean[total_made]
+    p_mean = alpha / (alpha + beta)
+    p_var = alpha * beta / ((alpha + beta) ** 2 * (alpha + beta + 1))
+    if np.isnan(p_mean):
+        p_mean, p_var = 0., 0.
+    p_square = p_var + p_mean ** 2
+    made_mean = mean * p_mean
+    made_var = (mean * (p_mean - p_square) + (variance + mean ** 2) * p_square
+                - (mean * p_mean) ** 2)
+    return [mean, variance, made_mean, made_var, variance * p_mean]
+
+def player_moments(model):
+    if model.key not in MOMENTS_CACHE:
+        games = model.num_games
+        counting = [[model.mean[c] * games, (model.std[c] * games) ** 2]
+                    for c in COUNTING_CATS]
+        MOMENTS_CACHE[model.key] = np.array(
+            shot_moments(model, 'FGA', 'TFGM', 'TFGA')
+            + shot_moments(model, 'FTA', 'TFTM', 'TFTA')
+            + [m for moments in counting for m in moments])
+    return MOMENTS_CACHE[model.key]
+
+def ratio_moments(attempts, attempts_var, made, made_var, covariance):
+    mean = made / attempts
+    variance = (made_var / attempts ** 2
+                - 2 * made * covariance / attempts ** 3
+                + made ** 2 * attempts_var / attempts ** 4)
+    return mean, variance
+
+def totals_moments(totals):
+    fg = ratio_moments(*np.moveaxis(totals[..., 0:5], -1, 0))
+    ft = ratio_moments(*np.moveaxis(totals[..., 5:10], -1, 0))
+    mean = np.concatenate([np.stack([fg[0], ft[0]], -1), totals[..., 10::2]], -1)
+    variance = np.concatenate([np.stack([fg[1], ft[1]], -1), totals[..., 11::2]], -1)
+    return mean, variance
+
+def team_moments(models):
+    if len(models) == 0:
+        totals = np.zeros(MOMENTS_SIZE)
+    else:
+        totals = np.sum([player_moments(model) for model in models], axis=0)
+    return totals_moments(totals)
+
+def category_probabilities(moments1, moments2):
+    diff = moments1[0] - moments2[0]
+    diff[..., -1] = -diff[..., -1]
+    scale = np.sqrt(moments1[1] + moments2[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probs = sp.ndtr(diff / scale)
+    probs = np.where(scale > 0, probs, (diff > 0).astype(np.float64))
+    return np.nan_to_num(probs)
+
+def points_distribution(probs):
+    distribution = np.ones(probs.shape[:-1] + (1,))
+    empty = np.zeros(probs.shape[:-1] + (1,))
+    for i in range(probs.shape[-1]):
+        p = probs[..., i:i + 1]
+        distribution = (np.concatenate([distribution * (1 - p), empty], -1)
+                        + np.concatenate([empty, distribution * p], -1))
+    return distribution
+
+class AnalyticScorer(object):
+
+    def __init__(self, opponent, week=CURRENT_WEEK, num_days=14,
+                 decay_rate=0.1, include_bench=False, include_injured=False):
+        self.opponent = opponent
+        self.week = week
+        self.num_days = num_days
+        self.decay_rate = decay_rate
+        self.include_bench = include_bench
+        self.include_injured = include_injured
+        self.base = week_start(week)
+        self.opponent_moments = self.moments(opponent)
+
+    def moments(self, roster):
+        models = fit_players(roster, self.base, num_days=self.num_days,
+                             decay_rate=self.decay_rate)
+        valid_index = starter_index(roster, models,
+                                    include_bench=self.include_bench,
+                                    include_injured=self.include_injured)
+        return team_moments([models[i] for i in valid_index])
+
+    def __call__(self, roster):
+        probs = category_probabilities(self.moments(roster), self.opponent_moments)
+        return probs, points_distribution(probs)
+
+METRICS = {
+    'winning_probability': lambda probs, distribution: distribution[5:].sum(),
+    'ev': lambda probs, distribution: probs.sum(),
+}
+
+class AnalyticScore(object):
+
+    def __init__(self, scorer, metric='winning_probability'):
+        self.scorer = scorer
+        self.metric = METRICS[metric]
+
+    def __call__(self, roster):
+        return self.metric(*self.scorer(roster))
+
+    def many(self, rosters):
+        return np.array([self(roster) for roster in rosters])
+
+def analytic_h2h(roster1, roster2, week=CURRENT_WEEK, num_days=14,
+                 decay_rate=0.1, include_bench=False, include_injured=False):
+    scorer = AnalyticScorer(roster2, week=week, num_days=num_days,
+                            decay_rate=decay_rate, include_bench=include_bench,
+                            include_injured=include_injured)
+    probs, distribution = scorer(roster1)
+    return dict(zip(CATEGORY_NAMES, probs)), distribution
@@ -0,0 +1,83 @@
+import datetime
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from tabulate import tabulate
+
+from .team import STARTING_SLOTS
+from .sim import fit_roster
+from .analytic import (player_moments, totals_moments, category_probabilities,
+                       points_distribution, MOMENTS_SIZE)
+
+__all__ = ['game_matrix', 'slot_eligibility', 'player_priorities',
+           'daily_lineups', 'daily_teams', 'print_daily_lineups']
+
+def week_days(base, week_length=7):
+    return [base + datetime.timedelta(days=d) for d in range(week_length)]
+
+def game_matrix(models, base, week_length=7):
+    days = week_days(base, week_length)
+    return np.array([[day in model.game_dates for day in days] for model in models],
+                    dtype=bool).reshape([len(models), len(days)])
+
+def slot_eligibility(roster, models, include_injured=False):
+    return np.array([[
+        model.games_played > 0
+        and (include_injured or roster.positions[player] != 'IL')
+        and slot in player.eligible_positions
+        for slot in STARTING_SLOTS] for player, model in zip(roster, models)
+    ], dtype=bool).reshape([len(models), len(STARTING_SLOTS)])
+
+def roster_moments(models, eligible):
+    return np.array([player_moments(model) if e.any() else np.zeros(MOMENTS_SIZE)
+                     for model, e in zip(models, eligible)]).reshape([len(models), MOMENTS_SIZE])
+
+def player_priorities(models, eligible, opponent_moments):
+    moments = roster_moments(models, eligible)
+    total = moments.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean, variance = totals_moments(np.concatenate([total[None], total[None] - moments]))
+    probs = category_probabilities((mean, variance), opponent_moments)
+    win = points_distribution(probs)[:, 5:].sum(axis=-1)
+    games = np.maximum([model.num_games for model in models], 1)
+    return 1. + (win[0] - win[1:]) / games
+
+def daily_lineups(games, eligible, priority):
+    slots = -np.ones(games.shape, dtype=np.int64)
+    for day in range(games.shape[1]):
+        playing = np.flatnonzero(games[:, day] & eligible.any(axis=1))
+        if len(playing) == 0:
+            continue
+        weight = np.where(eligible[playing], priority[playing, None], 0.)
+        rows, cols = linear_sum_assignment(weight, maximize=True)
+        started = weight[rows, cols] > 0
+        slots[playing[rows[started]], day] = cols[started]
+    return slots
+
+def daily_teams(roster1, roster2, base, num_days=14, decay_rate=0.1,
+                include_injured=False, week_length=7):
+    teams = []
+    for roster in [roster1, roster2]:
+        mean, std, models = fit_roster(roster, base, num_days=num_days,
+                                       decay_rate=decay_rate,
+                                       week_length=week_length)
+        eligible = slot_eligibility(roster, models, include_injured=include_injured)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moments = totals_moments(roster_moments(models, eligible).sum(axis=0))
+        teams.append((mean, std, models, eligible, moments))
+    results = []
+    for i, (mean, std, models, eligible, _) in enumerate(teams):
+        priority = player_priorities(models, eligible, teams[1 - i][4])
+        slots = daily_lineups(game_matrix(models, base, week_length), eligible,
+                              priority)
+        mean = mean.copy()
+        mean["Num Games"] = (slots >= 0).sum(axis=1).astype(np.float64)
+        results.append((mean, std, (slots >= 0).any(axis=1), slots))
+    return results
+
+def print_daily_lineups(roster, slots, base):
+    days = week_days(base, slots.shape[1])
+    print(tabulate([
+        [player.name] + ["-" if s < 0 else STARTING_SLOTS[s] for s in row]
+        + [int((row >= 0).sum())]
+        for player, row in zip(roster, slots)
+    ], headers=["Player"] + [day.strftime("%a %m/%d") for day in days] + ["Games"]))
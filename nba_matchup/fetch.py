@@ -0,0 +1,134 @@
+import os
+import atexit
+import random
+import asyncio
+import threading
+
+import aiohttp
+
+from .replay import Response, recording, replaying, save, load
+
+__all__ = ['FetchEngine', 'FetchError', 'get_engine', 'set_engine']
+
+FETCH_CONCURRENCY = int(os.environ.get('NBA_MATCHUP_CONCURRENCY', 16))
+FETCH_RATE = float(os.environ.get('NBA_MATCHUP_RATE', 20))
+FETCH_RETRIES = 4
+FETCH_BACKOFF = 0.5
+FETCH_TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class FetchError(Exception):
+    pass
+
+class FetchEngine(object):
+
+    def __init__(self, concurrency=FETCH_CONCURRENCY, rate=FETCH_RATE,
+                 retries=FETCH_RETRIES, backoff=FETCH_BACKOFF,
+                 timeout=FETCH_TIMEOUT):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever,
+                                       name='nba-matchup-fetch', daemon=True)
+        self.thread.start()
+        self._session = None
+        self._semaphore = None
+        self._next_slot = 0.
+
+    def run(self, coroutine):
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("FetchEngine.run called from its own event loop")
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def get(self, url, headers=None):
+        return self.run(self.fetch(url, headers=headers))
+
+    def get_all(self, urls, headers=None):
+        async def fetch_all():
+            return await asyncio.gather(*[self.fetch(url, headers=headers) for url in urls])
+        return self.run(fetch_all())
+
+    async def session(self):
+        if self._session is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def throttle(self):
+        if self.rate is None or self.rate <= 0:
+            return
+        now = self.loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1. / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def fetch(self, url, headers=None):
+        if replaying():
+            return load(['GET', url])
+        response = await self.request(url, headers=headers)
+        if recording():
+            save(['GET', url], response)
+        return response
+
+    async def request(self, url, headers=None):
+        session = await self.session()
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt * (1 + random.random())
+            async with self._semaphore:
+                await self.throttle()
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        content = await response.read()
+                        if response.status not in RETRY_STATUSES:
+                            return Response(url, response.status,
+                                            dict(response.headers), content)
+                        retry_after = response.headers.get('Retry-After')
+                        if retry_after is not None and retry_after.isdigit():
+                            delay = max(delay, float(retry_after))
+                        error = FetchError("%s returned %u" % (url, response.status))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = FetchError("%s failed: %s" % (url, e))
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+        raise error
+
+    async def _close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        if self.thread.is_alive():
+            self.run(self._close())
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+        self.loop.close()
+
+_ENGINE = None
+_ENGINE_PID = None
+
+def get_engine():
+    global _ENGINE, _ENGINE_PID
+    if _ENGINE is None or _ENGINE_PID != os.getpid():
+        set_engine(FetchEngine())
+    return _ENGINE
+
+def set_engine(engine):
+    global _ENGINE, _ENGINE_PID
+    if _ENGINE is not None and _ENGINE_PID == os.getpid():
+        _ENGINE.close()
+    _ENGINE, _ENGINE_PID = engine, os.getpid()
+
+@atexit.register
+def _close_engine():
+    if _ENGINE is not None and _ENGINE_PID == os.getpid():
+        _ENGINE.close()
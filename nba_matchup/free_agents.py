@@ -1,13 +1,22 @@
-from .yfs import yfs, LEAGUE_KEY
+from yaspin import yaspin
+
+from .yfs import auth_headers, LEAGUE_KEY
 from .player import Player
+from .fetch import get_engine
 
-def get_free_agents(num_agents):
-    if num_agents == 0: return
-    result = yfs._get("https://fantasysports.yahooapis.com/fantasy/v2/league/{league_key}/players;status=FA;count={count};sort=AR".format(
-        league_key=LEAGUE_KEY,
-        count=num_agents
-    )).json()
-    for key, value in result['fantasy_content']['league'][1]['players'].items():
+FREE_AGENTS_URL = "https://fantasysports.yahooapis.com/fantasy/v2/league/{league_key}/players;status=FA;start={start};count={count};sort=AR?format=json"
+FREE_AGENTS_PAGE = 25
+
+def free_agent_pages(num_agents, page_size=FREE_AGENTS_PAGE, league_key=LEAGUE_KEY):
+    return [FREE_AGENTS_URL.format(league_key=league_key, start=start,
+                                   count=min(page_size, num_agents - start))
+            for start in range(0, num_agents, page_size)]
+
+def parse_free_agents(result):
+    players = result['fantasy_content']['league'][1]['players']
+    if not isinstance(players, dict):
+        return
+    for key, value in players.items():
         if key == 'count':
             continue
         player_dict = {}
@@ -17,3 +26,16 @@ def get_free_agents(num_agents):
                     player_dict[k] = v
         player_dict['selected_position'] = "BN"
         yield Player.from_dict(player_dict)
+
+def get_free_agents(num_agents, page_size=FREE_AGENTS_PAGE):
+    if num_agents == 0: return
+    urls = free_agent_pages(num_agents, page_size=page_size)
+    headers = auth_headers()
+    with yaspin(text="Fetching %u free agents" % num_agents, color='cyan'):
+        pages = get_engine().get_all(urls, headers=headers)
+    seen = set()
+    for page in pages:
+        for player in parse_free_agents(page.json()):
+            if player.player_key not in seen:
+                seen.add(player.player_key)
+                yield player
@@ -1,6 +1,8 @@
+import numpy as np
 from yaspin import yaspin
 
 from .yfs import yfs, LEAGUE_KEY, CURRENT_WEEK
+from .store import LEAGUE_METADATA
 from .team import get_teams
 
 class League(object):
@@ -25,26 +27,63 @@ class League(object):
                 self.matchups[team.team_key, w] = self.team_map[team_key]
         return self.matchups[team.team_key, week]
 
+    def standings(self):
+        wins = dict(get_standings(LEAGUE_KEY))
+        return [wins.get(team.team_key, 0.) for team in self.teams]
+
+    def schedule(self, weeks):
+        index = {team.team_key: i for i, team in enumerate(self.teams)}
+        schedule = -np.ones([len(weeks), len(self.teams)], dtype=np.int64)
+        for w, week in enumerate(weeks):
+            for i, team in enumerate(self.teams):
+                try:
+                    schedule[w, i] = index[self.get_matchup(team, week=week).team_key]
+                except KeyError:
+                    pass
+        return schedule
+
 def get_league(league_key=LEAGUE_KEY):
     teams = get_teams(league_key)
     return League(list(teams))
 
 
 def get_matchups(team_key):
-    with yaspin(text="Fetching matchup", color='cyan'):
-        matchups = (
-            yfs.get_teams_matchups([team_key]).json()
-            ['fantasy_content']['teams']['0']['team'][1]['matchups']
-        )
-        for key, value in matchups.items():
-            if key == 'count':
-                continue
-            week = value['matchup']['week']
-            team_props = value['matchup']['0']['teams']['1']['team']
-            team_dict = {}
-            for prop in team_props[0]:
-                if isinstance(prop, dict):
-                    for k, v in prop.items():
-                        team_dict[k] = v
-            matchup = team_dict['team_key']
-            yield int(week), matchup
+    def fetch():
+        with yaspin(text="Fetching matchup", color='cyan'):
+            return yfs.get_teams_matchups([team_key]).json()
+    matchups = (
+        LEAGUE_METADATA.cached('matchups', LEAGUE_KEY, fetch, team_key=team_key)
+        ['fantasy_content']['teams']['0']['team'][1]['matchups']
+    )
+    for key, value in matchups.items():
+        if key == 'count':
+            continue
+        week = value['matchup']['week']
+        team_props = value['matchup']['0']['teams']['1']['team']
+        team_dict = {}
+        for prop in team_props[0]:
+            if isinstance(prop, dict):
+                for k, v in prop.items():
+                    team_dict[k] = v
+        matchup = team_dict['team_key']
+        yield int(week), matchup
+
+def get_standings(league_key=LEAGUE_KEY):
+    def fetch():
+        with yaspin(text="Fetching standings", color='cyan'):
+            return yfs.get_leagues_standings([league_key]).json()
+    teams = (
+        LEAGUE_METADATA.cached('standings', league_key, fetch)
+        ['fantasy_content']['leagues']['0']['league'][1]['standings'][0]['teams']
+    )
+    for key, value in teams.items():
+        if key == 'count':
+            continue
+        team_key, totals = None, None
+        for props in value['team']:
+            for prop in props if isinstance(props, list) else [props]:
+                if isinstance(prop, dict) and 'team_key' in prop:
+                    team_key = prop['team_key']
+                if isinstance(prop, dict) and 'team_standings' in prop:
+                    totals = prop['team_standings']['outcome_totals']
+        yield team_key, float(totals['wins']) + 0.5 * float(totals.get('ties', 0))
@@ -1,110 +1,302 @@
-import functools
-from multiprocessing import Pool
 import random
 import itertools
+from collections import OrderedDict
 import numpy as np
 import tqdm
 
-from .util import print_roster
+from .util import print_roster, augment, max_matching
 from .team import TEAM, Roster
 
+METRICS = {
+    'winning_probability': lambda points: (points >= 5).astype(np.float64),
+    'ev': lambda points: points.astype(np.float64),
+}
+
+class MetricScore(object):
+
+    def __init__(self, scorer, metric='winning_probability'):
+        self.scorer = scorer
+        self.metric = METRICS[metric]
+
+    def __call__(self, roster):
+        return self.metric(self.scorer.points(roster)).mean()
+
+    def many(self, rosters):
+        _, points = self.scorer.score_many(rosters)
+        return self.metric(points).mean(axis=-1)
+
+class AdaptiveScore(MetricScore):
+
+    adaptive = True
+
+    def __init__(self, scorer, metric='winning_probability', batch_size=2000,
+                 budget=None, confidence=4.):
+        if scorer.sample_bank is None:
+            raise ValueError("Adaptive scoring requires a sample bank")
+        super(AdaptiveScore, self).__init__(scorer, metric=metric)
+        self.batch_size = batch_size
+        self.budget = scorer.num_samples if budget is None else min(budget, scorer.num_samples)
+        self.confidence = confidence
+        self.samples_spent = 0
+        self.num_evaluations = 0
+        self._full = []
+
+    def values(self, roster, start, stop):
+        points = self.scorer.points(roster, samples=slice(start, stop))
+        self.samples_spent += stop - start
+        return self.metric(points)
+
+    def full_values(self, roster):
+        for other, values in self._full:
+            if other is roster:
+                return values
+        values = self.values(roster, 0, self.budget)
+        self.remember(roster, values)
+        return values
+
+    def remember(self, roster, values):
+        self._full = [(roster, values)] + self._full[:1]
+
+    def __call__(self, roster):
+        return self.full_values(roster).mean()
+
+    def many(self, rosters):
+        _, points = self.scorer.score_many(rosters, samples=slice(0, self.budget))
+        self.samples_spent += len(rosters) * self.budget
+        self.num_evaluations += len(rosters)
+        return self.metric(points).mean(axis=-1)
+
+    def race(self, candidate, incumbent, threshold, values=None):
+        incumbent_values = self.full_values(incumbent)
+        offset = threshold - incumbent_values.mean()
+        if values is None:
+            values = np.zeros(0)
+            self.num_evaluations += 1
+        while len(values) < self.budget:
+            if len(values) > 1:
+                diff = values - incumbent_values[:len(values)]
+                error = diff.std(ddof=1) / np.sqrt(len(diff))
+                if diff.mean() + self.confidence * error < offset:
+                    return None, values
+            stop = min(len(values) + self.batch_size, self.budget)
+            values = np.concatenate([values, self.values(candidate, len(values), stop)])
+        self.remember(candidate, values)
+        return values.mean(), values
+
+def starter_signature(roster):
+    if hasattr(roster, 'starter_keys'):
+        return roster.starter_keys()
+    return frozenset(player.player_key for player, position in roster.positions.items()
+                     if position not in {'BN', 'IL'})
+
+class CachedScore(object):
+
+    def __init__(self, score, params=(), max_size=10000):
+        self.score = score
+        self.params = tuple(params)
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def adaptive(self):
+        return getattr(self.score, 'adaptive', False)
+
+    @property
+    def samples_spent(self):
+        return getattr(self.score, 'samples_spent', 0)
+
+    def key(self, roster):
+        return (starter_signature(roster),) + self.params
+
+    def lookup(self, key):
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+        return None
+
+    def store(self, key, value):
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def __call__(self, roster):
+        key = self.key(roster)
+        value = self.lookup(key)
+        if value is None:
+            self.misses += 1
+            value = self.score(roster)
+            self.store(key, value)
+        return value
+
+    def many(self, rosters):
+        keys = [self.key(roster) for roster in rosters]
+        values = {}
+        for key in keys:
+            if key not in values:
+                values[key] = self.lookup(key)
+        missing = [key for key, value in values.items() if value is None]
+        if len(missing) > 0:
+            self.misses += len(missing)
+            representatives = {key: roster for key, roster in zip(keys, rosters)}
+            for key, value in zip(missing, score_rosters(
+                    self.score, [representatives[key] for key in missing])):
+                values[key] = value
+                self.store(key, value)
+        return np.array([values[key] for key in keys])
+
+    def race(self, candidate, incumbent, threshold, values=None):
+        key = self.key(candidate)
+        if values is None:
+            value = self.lookup(key)
+            if value is not None:
+                return value, None
+            self.misses += 1
+        value, values = self.score.race(candidate, incumbent, threshold, values)
+        if value is not None:
+            self.store(key, value)
+        return value, values
+
+    def __str__(self):
+        return "%u hits, %u misses, %u cached" % (self.hits, self.misses,
+                                                  len(self.cache))
+
+def propose(roster, score, num_proposals, ignore_players=set(),
+            ignore_injured=False):
+    candidates = [roster.random_swap(ignore_players=ignore_players,
+                                     ignore_injured=ignore_injured)
+                  for _ in range(num_proposals)]
+    scores = score_rosters(score, candidates)
+    best = int(np.argmax(scores))
+    return candidates[best], scores[best]
+
 def hill_climb(roster, score, num_steps = 1000, ignore_players=set(),
-               ignore_injured=False):
+               ignore_injured=False, num_proposals=1):
+    adaptive = getattr(score, 'adaptive', False) and num_proposals == 1
     current_score = score(roster)
     yield roster, current_score
     rng = tqdm.trange(num_steps, desc='Optimizing[%.3f]' % current_score)
     for _ in rng:
-        candidate_roster = roster.random_swap(ignore_players=ignore_players,
-                                              ignore_injured=ignore_injured)
-        candidate_score = score(candidate_roster)
-        if candidate_score > current_score:
+        if num_proposals > 1:
+            candidate_roster, candidate_score = propose(
+                roster, score, num_proposals, ignore_players=ignore_players,
+                ignore_injured=ignore_injured)
+        elif adaptive:
+            candidate_roster = roster.random_swap(ignore_players=ignore_players,
+                                                  ignore_injured=ignore_injured)
+            spent = score.samples_spent
+            candidate_score, _ = score.race(candidate_roster, roster, current_score)
+            rng.set_postfix(samples=score.samples_spent - spent)
+        else:
+            candidate_roster = roster.random_swap(ignore_players=ignore_players,
+                                                  ignore_injured=ignore_injured)
+            candidate_score = score(candidate_roster)
+        if candidate_score is not None and candidate_score > current_score:
             roster, current_score = candidate_roster, candidate_score
             rng.set_description('Optimizing[%.3f]' % current_score)
             yield roster, current_score
 
 def simulated_annealing(roster, score, num_steps = 1000, ignore_players=set(),
-               ignore_injured=False, anneal_start=0.2, anneal_decay=0.5):
+               ignore_injured=False, anneal_start=0.2, anneal_decay=0.5,
+               num_proposals=1):
+    adaptive = getattr(score, 'adaptive', False) and num_proposals == 1
     current_score = score(roster)
     yield roster, current_score
     temperature = anneal_start
     rng = tqdm.trange(num_steps, desc='Optimizing[%.3f]' % current_score)
     for _ in rng:
-        candidate_roster = roster.random_swap(ignore_players=ignore_players,
-                                              ignore_injured=ignore_injured)
-        candidate_score = score(candidate_roster)
-        if candidate_score > current_score:
+        if num_proposals > 1:
+            candidate_roster, candidate_score = propose(
+                roster, score, num_proposals, ignore_players=ignore_players,
+                ignore_injured=ignore_injured)
+        elif adaptive:
+            candidate_roster = roster.random_swap(ignore_players=ignore_players,
+                                                  ignore_injured=ignore_injured)
+            spent = score.samples_spent
+            candidate_score, values = score.race(candidate_roster, roster, current_score)
+        else:
+            candidate_roster = roster.random_swap(ignore_players=ignore_players,
+                                                  ignore_injured=ignore_injured)
+            candidate_score = score(candidate_roster)
+        if candidate_score is not None and candidate_score > current_score:
             roster, current_score = candidate_roster, candidate_score
             rng.set_description('Optimizing[%.3f, %.3f]' % (current_score, temperature))
             yield roster, current_score
         else:
-            accept_prob = (candidate_score - current_score) / temperature
-            if np.log(np.random.random()) <= accept_prob:
-                roster, current_score = candidate_roster, candidate_score
-                rng.set_description('Optimizing[%.3f, %.3f]' % (current_score, temperature))
-                yield roster, current_score
+            log_u = np.log(np.random.random())
+            if candidate_score is None:
+                candidate_score, _ = score.race(candidate_roster, roster,
+                                                current_score + temperature * log_u,
+                                                values)
+            if candidate_score is not None:
+                accept_prob = (candidate_score - current_score) / temperature
+                if log_u <= accept_prob:
+                    roster, current_score = candidate_roster, candidate_score
+                    rng.set_description('Optimizing[%.3f, %.3f]' % (current_score, temperature))
+                    yield roster, current_score
+        if adaptive:
+            rng.set_postfix(samples=score.samples_spent - spent)
         temperature *= anneal_decay
 
-def form_roster(players, team, roster):
-    if len(players) == 0:
-        return all(v == 0 for v in team.values()), roster
-    player = players[0]
-    players = players[1:]
-    position = None
-    eligible = list(player.eligible_positions - {'Util'})
-    if all(team[p] == 0 for p in eligible):
-        position = 'Util'
-    else:
-        while position is None or team[position] == 0:
-            position = random.choice(eligible)
-    roster.positions[player] = position
-    roster.players.append(player)
-    team[position] -= 1
-    return form_roster(players, team.copy(), roster)
-
-# def team_generator(team, positions, remaining_players,
-                   # ignore_injured=True, ignore_players=set()):
-    # if all([v == 0 for v in team.values()]):
-        # yield positions
-    # available_positions = {k: v for k, v in team.items() if v > 0}
-    # for position, num_slots in available_positions.items():
-        # eligible_players = [p for p in remaining_players if
-                            # not (ignore_injured and p.status == 'INJ')
-                            # and not (p in ignore_players)
-                            # and position in p.eligible_positions]
-        # for player_combo in itertools.combinations(eligible_players, num_slots):
-            # new_team = team.copy()
-            # new_positions = positions.copy()
-            # for player in player_combo:
-                # new_team[position] -= 1
-                # new_positions[player] = position
-            # yield from team_generator(
-                # new_team, new_positions, [p for p in remaining_players if p not in player_combo]
-            # )
-def score_roster(score, players):
-    valid, roster = form_roster(sorted(players, key=lambda x: len(x.eligible_positions)), TEAM.copy(), Roster([], {}))
-    if not valid:
-        return roster, float('-inf')
-    return roster, score(roster)
-
-# def roster_score(other_roster, num_days, num_samples, week, decay_rate, roster):
-    # cats, points, scores, _ = simulate_h2h(roster,
-                        # other_roster,
-                        # num_days=num_days, num_samples=num_samples,
-                        # week=week, decay_rate=decay_rate)
-    # return winning_prob(cats, points, scores, num_samples)
-
-
-def brute_force(roster, score, ignore_players=set(), ignore_injured=False):
-    num_valid = 0
-    eligible_players = [p for p in roster.players if p.status != 'INJ']
-    best = (None, float('-inf'))
-    pool = Pool(20)
-    scores = tqdm.tqdm(
-        pool.imap(functools.partial(score_roster, score), itertools.combinations(eligible_players, 10)),
-    total=3003)
+def starter_sets(players, team=TEAM):
+    slots = [slot for slot, count in team.items() for _ in range(count)]
+    players = [p for p in players if len(p.eligible_positions & set(slots)) > 0]
+    size = max_matching(players, slots)
+    def extend(start, matching, num_chosen):
+        if num_chosen == size:
+            yield {player: slot for slot, player in zip(slots, matching)
+                   if player is not None}
+            return
+        for i in range(start, len(players) - (size - num_chosen) + 1):
+            new_matching = matching[:]
+            if augment(players[i], slots, new_matching, set()):
+                yield from extend(i + 1, new_matching, num_chosen + 1)
+    yield from extend(0, [None] * len(slots), 0)
+
+def score_rosters(score, rosters):
+    if hasattr(score, 'many'):
+        return np.asarray(score.many(rosters))
+    return np.array([score(roster) for roster in rosters])
+
+def confirm(score, roster, baseline):
+    roster_score, baseline_score = score(roster), score(baseline)
+    if roster_score >= baseline_score:
+        return roster, roster_score
+    return baseline, baseline_score
+
+def brute_force(roster, score, ignore_players=set(), ignore_injured=False,
+                batch_size=32, team=TEAM):
+    positions = roster.positions
+    fixed = {p: positions[p] for p in ignore_players
+             if positions[p] not in {'BN', 'IL'}}
+    counts = team.copy()
+    for position in fixed.values():
+        counts[position] -= 1
+    candidates = [p for p in roster if p not in ignore_players
+                  and positions[p] != 'IL'
+                  and not (ignore_injured and p.status == 'INJ')]
+    def lineups():
+        for starters in starter_sets(candidates, counts):
+            lineup = {p: 'IL' if positions[p] == 'IL' else 'BN'
+                      for p in roster}
+            lineup.update(fixed)
+            lineup.update(starters)
+            yield Roster(roster.players, lineup)
+    lineups = lineups()
     best = (None, float('-inf'))
-    for roster, s in scores:
-        if s > best[1]:
-            best = (roster, s)
-            scores.set_description(str(best[1]))
+    progress = tqdm.tqdm(desc='Searching', unit='lineups')
+    while True:
+        batch = list(itertools.islice(lineups, batch_size))
+        if len(batch) == 0:
+            break
+        scores = score_rosters(score, batch)
+        progress.update(len(batch))
+        i = int(np.argmax(scores))
+        if scores[i] > best[1]:
+            best = (batch[i], scores[i])
+            progress.set_description('Searching[%.3f]' % best[1])
             yield best
+    progress.close()
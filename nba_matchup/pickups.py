@@ -0,0 +1,70 @@
+import numpy as np
+from nba_matchup import CURRENT_WEEK
+
+from .team import Roster
+from .sim import H2HScorer, SampleBank, fit_roster
+from .opt import METRICS
+from .trades import TradeState
+
+__all__ = ['PickupState', 'rank_pickups']
+
+class PickupState(TradeState):
+
+    def __init__(self, roster, agents, opponent, week=CURRENT_WEEK, num_days=14,
+                 decay_rate=0.1, ignore_injured=True):
+        pool = Roster(agents, {agent: 'BN' for agent in agents})
+        super(PickupState, self).__init__([roster, pool, opponent], 0, week=week,
+                                          num_days=num_days, decay_rate=decay_rate,
+                                          ignore_injured=ignore_injured,
+                                          partners=[1])
+
+    def packages(self, partner=1, max_size=1):
+        adds = np.flatnonzero(self.active[partner])
+        for drop in range(len(self.rosters[self.team].players)):
+            for add in adds:
+                yield (drop,), (add,)
+
+    def evaluate(self, partner=1, packages=None):
+        if packages is None:
+            packages = self.packages(partner)
+        return [(drop, add) + self.side(self.team, partner, drop, add)
+                for drop, add in packages]
+
+    def lineups(self, pickups, partner=1):
+        return [self.lineup(self.team, partner, (), (), self.base[self.team, partner][0])] + [
+            self.lineup(self.team, partner, drop, add, assignment)
+            for drop, add, _, assignment in pickups
+        ]
+
+def rank_pickups(roster, agents, opponent, week=CURRENT_WEEK, num_days=14,
+                 decay_rate=0.1, num_samples=10000, sample_bank=None,
+                 metric='winning_probability', ignore_injured=True, batch_size=16,
+                 num_checks=40, dtype=np.float64):
+    state = PickupState(roster, agents, opponent, week=week, num_days=num_days,
+                        decay_rate=decay_rate, ignore_injured=ignore_injured)
+    pickups = sorted(state.evaluate(), key=lambda p: -p[2])[:num_checks]
+    agents = state.rosters[1].players
+    added = list({agents[add[0]]: None for _, add, _, _ in pickups})
+    if sample_bank is None:
+        sample_bank = SampleBank(num_samples, dtype=dtype,
+                                 capacity=len(roster.players) + len(added)
+                                 + len(opponent.players))
+    scorer = H2HScorer(opponent, week=week, num_days=num_days,
+                       num_samples=num_samples, decay_rate=decay_rate,
+                       sample_bank=sample_bank, dtype=dtype)
+    players = roster.players + added
+    mean, std, models = fit_roster(players, scorer.base, num_days=num_days,
+                                   decay_rate=decay_rate)
+    sample_bank.add(models, mean, std)
+    lineups = [tuple(sorted(scorer.columns(lineup))) for lineup in state.lineups(pickups)]
+    unique = {}
+    for lineup in lineups:
+        unique.setdefault(lineup, len(unique))
+    columns = [np.array(lineup, dtype=np.int64) for lineup in unique]
+    values = np.concatenate([
+        METRICS[metric](scorer.score_columns(columns[i:i + batch_size])[1]).mean(axis=-1)
+        for i in range(0, len(columns), batch_size)
+    ])[[unique[lineup] for lineup in lineups]]
+    results = [(agents[add[0]], roster.players[drop[0]], delta, value - values[0])
+               for (drop, add, delta, _), value in zip(pickups, values[1:])]
+    return sorted(results, key=lambda p: -p[3])
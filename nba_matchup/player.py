@@ -18,6 +18,7 @@ class Player(object):
         self.eligible_positions = eligible_positions
         self.selected_position = selected_position
         self._stats = None
+        self._window = None
 
     @classmethod
     def from_dict(cls, player_dict):
@@ -56,8 +57,12 @@ class Player(object):
         )
         return df, self._stats[1]
 
-    def set_stats(self, stats):
+    def set_stats(self, stats, window=None):
         self._stats = stats
+        self._window = window
+
+    def has_stats(self, window):
+        return self._stats is not None and self._window in {None, window}
 
     def is_out(self):
         return self.status == 'INJ' or self.status == 'O'
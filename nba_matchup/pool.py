@@ -0,0 +1,128 @@
+import random
+import multiprocessing
+import numpy as np
+
+from .team import PlayerTable, CompactRoster
+from .opt import METRICS, MetricScore, CachedScore, hill_climb
+
+__all__ = ['WorkerPool', 'ScorePool', 'PoolScore']
+
+WORKER_STATE = None
+
+def init_worker(state):
+    global WORKER_STATE
+    WORKER_STATE = state
+
+def worker_state():
+    return WORKER_STATE
+
+def score_task(opponent, columns, metric):
+    scorers, _ = worker_state()
+    _, points = scorers[opponent].score_columns(columns)
+    return METRICS[metric](points).mean(axis=-1)
+
+def climb_task(opponent, indices, slots, metric, seed, kwargs):
+    random.seed(seed)
+    np.random.seed(seed)
+    scorers, table = worker_state()
+    score = CachedScore(MetricScore(scorers[opponent], metric=metric))
+    for roster, value in hill_climb(CompactRoster(table, indices, slots), score, **kwargs):
+        pass
+    return roster.indices, roster.slots, value
+
+class WorkerPool(object):
+
+    def __init__(self, state, processes=None):
+        self.state = state
+        self.processes = processes or multiprocessing.cpu_count()
+        self.pool = None
+        self.version = None
+
+    def state_version(self):
+        return None
+
+    def start(self):
+        if self.pool is None or self.version != self.state_version():
+            self.close()
+            self.version = self.state_version()
+            self.pool = multiprocessing.Pool(self.processes, initializer=init_worker,
+                                             initargs=(self.state,))
+        return self.pool
+
+    def starmap(self, func, tasks):
+        return self.start().starmap(func, tasks)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def terminate(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+class ScorePool(WorkerPool):
+
+    def __init__(self, scorers, rosters=(), processes=None):
+        if any(scorer.sample_bank is None or scorer.sample_bank is not scorers[0].sample_bank
+               for scorer in scorers):
+            raise ValueError("Pooled scorers must share one sample bank")
+        super(ScorePool, self).__init__((scorers, PlayerTable()), processes=processes)
+        self.scorers = scorers
+        self.table = self.state[1]
+        self.bank = scorers[0].sample_bank
+        for roster in rosters:
+            self.add(roster)
+
+    def add(self, roster):
+        self.scorers[0].columns(roster)
+        return CompactRoster.from_roster(roster, table=self.table)
+
+    def state_version(self):
+        return len(self.bank), len(self.table)
+
+    def score(self, opponent, rosters, metric='winning_probability'):
+        columns = [self.scorers[opponent].columns(roster) for roster in rosters]
+        if len(columns) == 0:
+            return np.zeros(0)
+        chunks = np.array_split(np.arange(len(columns)), min(self.processes, len(columns)))
+        results = self.starmap(score_task, [
+            (opponent, [columns[i] for i in chunk], metric) for chunk in chunks
+        ])
+        return np.concatenate(results)
+
+    def climb(self, tasks, metric='winning_probability', **kwargs):
+        tasks = [(opponent, self.add(roster)) for opponent, roster in tasks]
+        results = self.starmap(climb_task, [
+            (opponent, roster.indices, roster.slots, metric,
+             random.getrandbits(32), kwargs)
+            for opponent, roster in tasks
+        ])
+        return [(CompactRoster(self.table, indices, slots), value)
+                for indices, slots, value in results]
+
+class PoolScore(object):
+
+    def __init__(self, pool, opponent=0, metric='winning_probability'):
+        self.pool = pool
+        self.opponent = opponent
+        self.metric = metric
+        self.score = MetricScore(pool.scorers[opponent], metric=metric)
+
+    def __call__(self, roster):
+        return self.score(roster)
+
+    def many(self, rosters):
+        return self.pool.score(self.opponent, rosters, metric=self.metric)
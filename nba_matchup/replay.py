@@ -0,0 +1,108 @@
+import os
+import json
+import random
+import hashlib
+import datetime
+
+import numpy as np
+
+__all__ = ['HTTP_MODE', 'FIXTURE_DIR', 'MissingFixture', 'today']
+
+HTTP_MODE = os.environ.get('NBA_MATCHUP_HTTP', 'live')
+FIXTURE_DIR = os.environ.get('NBA_MATCHUP_FIXTURES', 'fixtures')
+SEED = int(os.environ.get('NBA_MATCHUP_SEED', 0))
+
+if HTTP_MODE not in {'live', 'record', 'replay'}:
+    raise ValueError("NBA_MATCHUP_HTTP must be one of live, record or replay, not %s"
+                     % HTTP_MODE)
+
+class MissingFixture(KeyError):
+    pass
+
+class Response(object):
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+def recording():
+    return HTTP_MODE == 'record'
+
+def replaying():
+    return HTTP_MODE == 'replay'
+
+def fixture_path(key):
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode('utf-8'))
+    return os.path.join(FIXTURE_DIR, digest.hexdigest() + '.json')
+
+def save(key, response):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(fixture_path(key), 'w') as fp:
+        json.dump({
+            'key': key,
+            'url': response.url,
+            'status_code': response.status_code,
+            'headers': dict(response.headers),
+            'content': response.content.decode('utf-8'),
+        }, fp, default=str)
+
+def load(key):
+    path = fixture_path(key)
+    if not os.path.exists(path):
+        raise MissingFixture("No fixture recorded for %s" % (key,))
+    with open(path) as fp:
+        fixture = json.load(fp)
+    return Response(fixture['url'], fixture['status_code'], fixture['headers'],
+                    fixture['content'].encode('utf-8'))
+
+def session():
+    path = os.path.join(FIXTURE_DIR, 'session.json')
+    if os.path.exists(path):
+        with open(path) as fp:
+            return json.load(fp)
+    if replaying():
+        raise MissingFixture("No session recorded in %s" % FIXTURE_DIR)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    info = {'today': datetime.date.today().isoformat()}
+    with open(path, 'w') as fp:
+        json.dump(info, fp)
+    return info
+
+_TODAY = None
+
+def today():
+    global _TODAY
+    if HTTP_MODE == 'live':
+        return datetime.date.today()
+    if _TODAY is None:
+        _TODAY = datetime.date.fromisoformat(session()['today'])
+    return _TODAY
+
+class ReplayClient(object):
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def __getattr__(self, attr):
+        def call(*args, **kwargs):
+            key = [self.name, attr, list(args), kwargs]
+            if replaying():
+                return load(key)
+            response = getattr(self.client, attr)(*args, **kwargs)
+            save(key, response)
+            return response
+        return call
+
+if HTTP_MODE != 'live':
+    random.seed(SEED)
+    np.random.seed(SEED)
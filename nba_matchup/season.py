@@ -0,0 +1,93 @@
+import datetime
+import numpy as np
+from nba_matchup import CURRENT_WEEK
+
+from .sim import (fit_roster, starter_index, week_start, sample_stats,
+                  team_categories, score_categories)
+
+__all__ = ['SeasonSummary', 'simulate_season']
+
+class SeasonSummary(object):
+
+    def __init__(self, num_teams, num_playoff=6):
+        self.num_seasons = 0
+        self.num_playoff = num_playoff
+        self.rank_counts = np.zeros([num_teams, num_teams], dtype=np.int64)
+        self.win_totals = np.zeros(num_teams)
+
+    def update(self, wins):
+        num_teams, num_seasons = wins.shape
+        order = np.lexsort((np.random.random_sample(wins.shape), -wins), axis=0)
+        np.add.at(self.rank_counts, (order, np.arange(num_teams)[:, None]), 1)
+        self.win_totals += wins.sum(axis=1)
+        self.num_seasons += num_seasons
+        return self
+
+    @property
+    def rank_probabilities(self):
+        return self.rank_counts / self.num_seasons
+
+    @property
+    def playoff_probabilities(self):
+        return self.rank_probabilities[:, :self.num_playoff].sum(axis=1)
+
+    @property
+    def expected_wins(self):
+        return self.win_totals / self.num_seasons
+
+    @property
+    def expected_rank(self):
+        return self.rank_probabilities @ np.arange(1, len(self.win_totals) + 1)
+
+def weekly_games(models, base, num_weeks, week_length=7):
+    starts = [base + datetime.timedelta(days=week_length * w) for w in range(num_weeks + 1)]
+    return np.array([[sum(start <= d < end for d in model.game_dates)
+                      for start, end in zip(starts, starts[1:])] for model in models],
+                    dtype=np.float64).reshape([len(models), num_weeks])
+
+def week_team(team, w):
+    mean, std, games = team
+    mean = mean.copy()
+    mean["Num Games"] = games[:, w]
+    return mean, std
+
+def simulate_season(rosters, schedule, week=CURRENT_WEEK, num_days=14,
+                    num_seasons=10000, decay_rate=0.1, wins=None,
+                    num_playoff=6, include_bench=False, include_injured=False,
+                    dtype=np.float64, chunk_size=1000):
+    schedule = np.asarray(schedule, dtype=np.int64).reshape([-1, len(rosters)])
+    num_weeks = len(schedule)
+    base = week_start(week)
+    teams = []
+    for roster in rosters:
+        mean, std, models = fit_roster(roster, base, num_days=num_days,
+                                       decay_rate=decay_rate,
+                                       week_length=7 * num_weeks)
+        valid = starter_index(roster, models, include_bench=include_bench,
+                              include_injured=include_injured)
+        teams.append((mean.iloc[valid], std.iloc[valid],
+                      weekly_games([models[i] for i in valid], base, num_weeks)))
+    games = np.concatenate([team[2] for team in teams])
+    for w in range(1, num_weeks):
+        if games[:, w].sum() == 0:
+            raise ValueError("No games projected for week %u of %u; player schedules "
+                             "do not cover the season" % (w + 1, num_weeks))
+    wins = np.zeros(len(rosters)) if wins is None else np.asarray(wins, dtype=np.float64)
+    summary = SeasonSummary(len(rosters), num_playoff=num_playoff)
+    for start in range(0, num_seasons, chunk_size):
+        size = min(chunk_size, num_seasons - start)
+        cats = np.stack([
+            np.stack([team_categories(sample_stats(week_team(team, w), num_samples=size,
+                                                   dtype=dtype))
+                      for w in range(num_weeks)])
+            for team in teams
+        ])
+        season_wins = np.repeat(wins[:, None], size, axis=1)
+        for w, opponents in enumerate(schedule):
+            played = np.flatnonzero(opponents >= 0)
+            mine, theirs = cats[played, w], cats[opponents[played], w]
+            points = score_categories(np.stack([mine, theirs]))
+            opponent_points = score_categories(np.stack([theirs, mine]))
+            season_wins[played] += (points > opponent_points) + 0.5 * (points == opponent_points)
+        summary.update(season_wins)
+    return summary
@@ -1,9 +1,12 @@
 import datetime
 import numpy as np
+import pandas as pd
 from nba_matchup import CURRENT_WEEK, START_DATE
 import scipy.special as sp
 
 from .util import print_roster
+from .team import Roster
+from .replay import today
 
 CATS = [
    'FGA', 'FGM', 'FTA', 'FTM', '3PTM', 'PTS', 'REB', 'AST', 'ST', 'BLK', 'TO'
@@ -17,99 +20,569 @@ CATEGORY_NAMES = [
 
 IGNORE_POSITIONS = ['BN', 'IL']
 
+FIT_CACHE = {}
+
+class PlayerModel(object):
+
+    def __init__(self, key, mean, std, num_games, games_played,
+                 game_dates=frozenset()):
+        self.key = key
+        self.mean = mean
+        self.std = std
+        self.num_games = num_games
+        self.games_played = games_played
+        self.game_dates = game_dates
+
+def week_start(week=CURRENT_WEEK):
+    if week is not None:
+        return START_DATE + datetime.timedelta(days=7 * (week - 1))
+    diff = (today() - START_DATE).days // 7
+    return START_DATE + datetime.timedelta(weeks=diff)
+
+def fit_players(roster, base_date, num_days=14, decay_rate=0.1, week_length=7):
+    keys = [(p.player_key, base_date, num_days, decay_rate, week_length)
+            for p in roster]
+    missing = [p for p, key in zip(roster, keys) if key not in FIT_CACHE]
+    if len(missing) > 0:
+        team_stats, player_games = Roster(missing, {p: 'BN' for p in missing}).stats(
+            num_days, base_date=base_date, week_length=week_length)
+        if len(team_stats) > 0:
+            mean, std = compute_average(team_stats, decay_rate=decay_rate)
+        else:
+            mean, std = pd.DataFrame(), pd.DataFrame()
+        for player, games in zip(missing, player_games):
+            games_played = int((team_stats['Name'] == player.name).sum())
+            if player.name in mean.index:
+                player_mean, player_std = mean.loc[player.name], std.loc[player.name]
+            else:
+                player_mean = pd.Series(np.nan, index=CATS + ['TFGM', 'TFGA', 'TFTM', 'TFTA'])
+                player_std = pd.Series(np.nan, index=CATS)
+            key = (player.player_key, base_date, num_days, decay_rate,
+                   week_length)
+            FIT_CACHE[key] = PlayerModel(key, player_mean, player_std,
+                                         len(games), games_played,
+                                         frozenset(games))
+    return [FIT_CACHE[key] for key in keys]
+
+def fit_roster(roster, base_date, num_days=14, decay_rate=0.1, week_length=7):
+    models = fit_players(roster, base_date, num_days=num_days,
+                         decay_rate=decay_rate, week_length=week_length)
+    index = pd.Index([p.name for p in roster], name='Name')
+    mean = pd.DataFrame([m.mean for m in models], index=index)
+    std = pd.DataFrame([m.std for m in models], index=index)
+    mean["Num Games"] = [float(m.num_games) for m in models]
+    std["Num Games"] = 0.
+    return mean, std, models
+
+class SampleBank(object):
+
+    def __init__(self, num_samples=10000, dtype=np.float64, capacity=0):
+        self.num_samples = num_samples
+        self.dtype = dtype
+        self.index = {}
+        self._samples = np.zeros([num_samples, capacity, len(CATS)], dtype=dtype)
+        self._means = np.zeros([capacity, len(CATS)])
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_samples'], state['_means'] = self.samples, self.means
+        return state
+
+    @property
+    def samples(self):
+        return self._samples[:, :len(self.index)]
+
+    @property
+    def means(self):
+        return self._means[:len(self.index)]
+
+    def reserve(self, size):
+        capacity = self._samples.shape[1]
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        samples = np.empty([self.num_samples, capacity, len(CATS)], dtype=self.dtype)
+        samples[:, :len(self.index)] = self.samples
+        means = np.empty([capacity, len(CATS)])
+        means[:len(self.index)] = self.means
+        self._samples, self._means = samples, means
+
+    def add(self, models, mean, std):
+        missing = [i for i, model in enumerate(models)
+                   if model.key not in self.index]
+        if len(missing) == 0:
+            return
+        start = len(self.index)
+        self.reserve(start + len(missing))
+        sample = sample_stats((mean.iloc[missing], std.iloc[missing]),
+                              num_samples=self.num_samples, dtype=self.dtype,
+                              out=self._samples[:, start:start + len(missing)])
+        self._means[start:start + len(missing)] = sample.mean(axis=0, dtype=np.float64)
+        for i in missing:
+            self.index[models[i].key] = len(self.index)
+
+    def indices(self, models):
+        return np.array([self.index[model.key] for model in models],
+                        dtype=np.int64)
+
+    def gather(self, models, samples=slice(None)):
+        return self.samples[samples, self.indices(models)]
+
+def check_sample_bank(sample_bank, num_samples):
+    if sample_bank is not None and sample_bank.num_samples != num_samples:
+        raise ValueError("Sample bank holds %u samples, not %u" %
+                         (sample_bank.num_samples, num_samples))
+
+def starter_index(team, models, include_bench=False, include_injured=False):
+    if hasattr(team, 'starter_mask'):
+        mask = team.starter_mask(include_bench=include_bench,
+                                 include_injured=include_injured)
+    else:
+        positions = team.positions
+        mask = [(include_bench or positions[player] != "BN")
+                and (include_injured or positions[player] != "IL")
+                for player in team]
+    return np.array([
+        i for i, (starter, model) in enumerate(zip(mask, models))
+        if starter and model.games_played > 0
+    ], dtype=np.int64)
+
+def simulate_roster(team, base, num_days=14, num_samples=10000,
+                    decay_rate=0.1, include_bench=False,
+                    include_injured=False, sample_bank=None,
+                    week_length=7, samples=None, dtype=np.float64,
+                    projection=True):
+    if samples is not None and sample_bank is None:
+        raise ValueError("Scoring a range of samples requires a sample bank")
+    if sample_bank is None:
+        mean, std, models = fit_roster(team, base, num_days=num_days,
+                                       decay_rate=decay_rate,
+                                       week_length=week_length)
+        valid_index = starter_index(team, models, include_bench=include_bench,
+                                    include_injured=include_injured)
+        return projected_stats((mean, std), set(mean.index[valid_index]),
+                               num_samples=num_samples, dtype=dtype)
+    models = fit_players(team, base, num_days=num_days, decay_rate=decay_rate,
+                         week_length=week_length)
+    if projection or any(model.key not in sample_bank.index for model in models):
+        mean, std, models = fit_roster(team, base, num_days=num_days,
+                                       decay_rate=decay_rate,
+                                       week_length=week_length)
+        sample_bank.add(models, mean, std)
+    valid_index = starter_index(team, models, include_bench=include_bench,
+                                include_injured=include_injured)
+    score = sample_bank.gather([models[i] for i in valid_index],
+                               slice(None) if samples is None else samples)
+    if projection:
+        projection = project(mean, sample_bank.means[sample_bank.indices(models)])
+    else:
+        projection = None
+    return score, projection
+
 def simulate_h2h(roster1, roster2, week=CURRENT_WEEK, num_days=14,
                  num_samples=10000, decay_rate=0.1,
                  include_bench=False,
-                 include_injured=False):
+                 include_injured=False,
+                 sample_bank=None,
+                 dtype=np.float64,
+                 daily=False):
+    check_sample_bank(sample_bank, num_samples)
     teams = [roster1, roster2]
 
-    diff = (datetime.datetime.today().date() - START_DATE).days // 7
-    if week is not None:
-        base = START_DATE + datetime.timedelta(days=7 * (week - 1))
-    else:
-        base = START_DATE + datetime.timedelta(weeks=diff)
+    base = week_start(week)
     scores, projections = [], []
     week_length = 7 #14 if week == 18 else 7
-    ignore = {'BN', 'IL'}
-    if include_bench:
-        ignore.remove("BN")
-    if include_injured:
-        ignore.remove("IL")
+    if daily:
+        if sample_bank is not None:
+            raise ValueError("Daily lineups cannot be scored from a sample bank")
+        from .daily import daily_teams
+        for mean, std, valid, _ in daily_teams(roster1, roster2, base,
+                                               num_days=num_days,
+                                               decay_rate=decay_rate,
+                                               include_injured=include_injured,
+                                               week_length=week_length):
+            score, projection = projected_stats((mean, std), set(mean.index[valid]),
+                                                num_samples=num_samples, dtype=dtype)
+            scores.append(score)
+            projections.append(projection)
+        cats, points = score_teams(*scores)
+        return cats, points, scores, projections
     for team in teams:
-        team_stats, player_games = team.stats(num_days, base_date=base,
-                                              week_length=week_length)
-        valid_players = set(team_stats[(team_stats["GP"] > 0) &
-                                              (include_bench or team_stats["Position"] != "BN")
-                                              & (include_injured or team_stats["Position"] !=
-                                                 "IL")]['Name'])
-        mean, std = compute_average(team_stats, decay_rate=decay_rate)
-        num_games = [(player, len(p)) for p, player in zip(player_games,
-                                                         team.players)]
-        for player, num_game in num_games:
-            mean.at[player.name, "Num Games"] = num_game
-        for player, num_game in num_games:
-            std.at[player.name, "Num Games"] = 0
-        score, projection = projected_stats((mean, std), valid_players, num_samples=num_samples)
-        valid_index = np.arange(len(mean.index))[mean.index.isin(valid_players)]
-        scores.append(score[:, valid_index])
+        score, projection = simulate_roster(team, base, num_days=num_days,
+                                            num_samples=num_samples,
+                                            decay_rate=decay_rate,
+                                            include_bench=include_bench,
+                                            include_injured=include_injured,
+                                            sample_bank=sample_bank,
+                                            week_length=week_length,
+                                            dtype=dtype)
+        scores.append(score)
         projections.append(projection)
     cats, points = score_teams(*scores)
     return cats, points, scores, projections
 
+class H2HScorer(object):
+
+    def __init__(self, opponent, week=CURRENT_WEEK, num_days=14,
+                 num_samples=10000, decay_rate=0.1,
+                 include_bench=False,
+                 include_injured=False,
+                 sample_bank=None,
+                 dtype=np.float64):
+        check_sample_bank(sample_bank, num_samples)
+        self.opponent = opponent
+        self.week = week
+        self.num_samples = num_samples
+        self.sample_bank = sample_bank
+        self.simulate_kwargs = dict(num_days=num_days,
+                                    num_samples=num_samples,
+                                    decay_rate=decay_rate,
+                                    include_bench=include_bench,
+                                    include_injured=include_injured,
+                                    sample_bank=sample_bank,
+                                    dtype=dtype)
+        self.base = week_start(week)
+        opponent_score, self.opponent_projection = simulate_roster(
+            opponent, self.base, **self.simulate_kwargs)
+        self.opponent_cats = team_categories(opponent_score)
+        if sample_bank is None:
+            self._opponent_score = opponent_score
+        else:
+            self._opponent_score = None
+            self.opponent_columns = self.columns(opponent)
+
+    @property
+    def opponent_score(self):
+        if self._opponent_score is None:
+            return self.sample_bank.samples[:, self.opponent_columns]
+        return self._opponent_score
+
+    def __call__(self, roster, samples=None, projection=False):
+        score, roster_projection = simulate_roster(roster, self.base, samples=samples,
+                                                   projection=projection,
+                                                   **self.simulate_kwargs)
+        opponent_score, opponent_cats = self.opponent_score, self.opponent_cats
+        if samples is not None:
+            opponent_score, opponent_cats = opponent_score[samples], opponent_cats[samples]
+        cats = np.stack([team_categories(score), opponent_cats])
+        return (cats, score_categories(cats), [score, opponent_score],
+                [roster_projection, self.opponent_projection])
+
+    def points(self, roster, samples=None):
+        if self.sample_bank is None:
+            return self(roster, samples=samples)[1]
+        return self.score_columns([self.columns(roster)], samples=samples)[1][0]
+
+    def score_many(self, rosters, samples=None):
+        if self.sample_bank is None:
+            if samples is not None:
+                raise ValueError("Scoring a range of samples requires a sample bank")
+            cats = np.stack([self(roster)[0] for roster in rosters], axis=1)
+            return np.moveaxis(cats, 1, 0), score_categories(cats)
+        return self.score_columns([self.columns(roster) for roster in rosters],
+                                  samples=samples)
+
+    def columns(self, roster):
+        kwargs = self.simulate_kwargs
+        models = fit_players(roster, self.base, num_days=kwargs['num_days'],
+                             decay_rate=kwargs['decay_rate'])
+        if any(model.key not in self.sample_bank.index for model in models):
+            mean, std, models = fit_roster(roster, self.base,
+                                           num_days=kwargs['num_days'],
+                                           decay_rate=kwargs['decay_rate'])
+            self.sample_bank.add(models, mean, std)
+        valid_index = starter_index(roster, models,
+                                    include_bench=kwargs['include_bench'],
+                                    include_injured=kwargs['include_injured'])
+        return self.sample_bank.indices([models[i] for i in valid_index])
+
+    def score_columns(self, columns, samples=None):
+        used, inverse = np.unique(np.concatenate(columns), return_inverse=True)
+        mask = np.zeros([len(columns), len(used)])
+        rows = np.repeat(np.arange(len(columns)), [len(c) for c in columns])
+        np.add.at(mask, (rows, inverse), 1.)
+        sample_range = slice(None) if samples is None else samples
+        totals = np.tensordot(mask, self.sample_bank.samples[sample_range][:, used],
+                              axes=[[1], [1]])
+        opponent_cats = self.opponent_cats[sample_range]
+        cats = np.stack([total_categories(totals),
+                         np.broadcast_to(opponent_cats, (len(columns),) + opponent_cats.shape)])
+        return np.moveaxis(cats, 1, 0), score_categories(cats)
+
 def compute_average(team_stats, decay_rate=0.1):
-    team_stats["Weight"] = np.exp(-decay_rate * team_stats["Days Ago"])
-    grouped = team_stats.groupby("Name")
-    def mean_func(x):
-        normed_weights = x['Weight'] / x['Weight'].sum()
-        mean = x[CATS].mul(normed_weights, axis=0).sum()
-        mean['TFGM'] = mean['FGM'] * len(normed_weights)
-        mean['TFGA'] = mean['FGA'] * len(normed_weights)
-        mean['TFTM'] = mean['FTM'] * len(normed_weights)
-        mean['TFTA'] = mean['FTA'] * len(normed_weights)
-        return mean
-    def std_func(x):
-        data = x[CATS]
-        normed_weights = x['Weight'] / x['Weight'].sum()
-        mean = data.mul(x["Weight"], axis=0)
-        deviation = (data.sub(mean, axis=1) ** 2).mul(x["Weight"], axis=0).sum(axis=0)
-        N = deviation.shape[0]
-        return np.sqrt(deviation / (N / (N - 1) * x["Weight"].sum()))
-    mean = grouped.apply(mean_func)
-    std = grouped.apply(std_func)
+    index, inverse = np.unique(team_stats["Name"].to_numpy(), return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    counts = np.bincount(inverse, minlength=len(index))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    data = np.nan_to_num(team_stats[CATS].to_numpy(dtype=np.float64)[order])
+    weight = np.exp(-decay_rate * team_stats["Days Ago"].to_numpy(dtype=np.float64)[order])
+    total_weight = np.add.reduceat(weight, starts)
+    normed_weights = weight / np.repeat(total_weight, counts)
+    mean = np.add.reduceat(data * normed_weights[:, None], starts)
+    totals = mean[:, [CATS.index(c) for c in ['FGM', 'FGA', 'FTM', 'FTA']]] * counts[:, None]
+    # Same estimator as the original per-player groupby: each game is
+    # centered on its own weighted value and N is the number of categories.
+    deviation = np.add.reduceat((data * (1 - weight[:, None])) ** 2 * weight[:, None], starts)
+    N = len(CATS)
+    std = np.sqrt(deviation / (N / (N - 1) * total_weight[:, None]))
+    index = pd.Index(index, name="Name")
+    mean = pd.DataFrame(np.concatenate([mean, totals], axis=1), index=index,
+                        columns=CATS + ['TFGM', 'TFGA', 'TFTM', 'TFTA'])
+    std = pd.DataFrame(std, index=index, columns=CATS)
     return mean, std
 
-def projected_stats(team, valid_players, num_samples=100):
-    sample = np.random.normal(loc=np.tile(team[0][NON_PERCENT_CATS].mul(team[0]["Num Games"], axis=0) , [num_samples, 1, 1]),
-                              scale=np.tile(team[1][NON_PERCENT_CATS].mul(team[0]["Num Games"], axis=0), [num_samples, 1, 1]))
-    projected = team[0].copy()
-    projected[NON_PERCENT_CATS] = sample.mean(axis=0)
+def projected_stats(team, valid_players, num_samples=100, dtype=np.float64):
+    valid = team[0].index.isin(valid_players)
+    sample = sample_stats((team[0][valid], team[1][valid]),
+                          num_samples=num_samples, dtype=dtype)
+    sample_mean = expected_stats(team[0])
+    sample_mean[valid] = sample.mean(axis=0)
+    return sample, project(team[0], sample_mean)
+
+def expected_stats(mean):
+    counts = mean[NON_PERCENT_CATS].mul(mean["Num Games"], axis=0).values
+    fgp = ((1. + mean['TFGM']) / (2. + mean['TFGA'])).fillna(0.).values
+    ftp = ((1. + mean['TFTM']) / (2. + mean['TFTA'])).fillna(0.).values
+    fga = np.maximum(counts[:, NON_PERCENT_CATS.index('FGA')], 0)
+    fta = np.maximum(counts[:, NON_PERCENT_CATS.index('FTA')], 0)
+    return np.concatenate([(fga * fgp)[:, None], (fta * ftp)[:, None], counts], axis=1)
+
+SAMPLE_CHUNK = 2 ** 20
+
+def sample_stats(team, num_samples=100, dtype=np.float64, out=None):
+    loc = team[0][NON_PERCENT_CATS].mul(team[0]["Num Games"], axis=0).values
+    scale = team[1][NON_PERCENT_CATS].mul(team[0]["Num Games"], axis=0).values
+    num_players = len(team[0])
+    integer = np.issubdtype(dtype, np.integer)
+    sample = (np.empty([num_samples, num_players, len(CATS)], dtype=dtype)
+              if out is None else out)
+    fga = np.empty([num_samples, num_players], dtype=np.int32)
+    fta = np.empty([num_samples, num_players], dtype=np.int32)
+    fga_index = 2 + NON_PERCENT_CATS.index('FGA')
+    fta_index = 2 + NON_PERCENT_CATS.index('FTA')
+    chunk = max(SAMPLE_CHUNK // max(num_players * len(NON_PERCENT_CATS), 1), 1)
+    chunks = [slice(start, min(start + chunk, num_samples))
+              for start in range(0, num_samples, chunk)]
+    for rows in chunks:
+        draw = np.random.normal(loc=loc, scale=scale,
+                                size=[rows.stop - rows.start, num_players,
+                                      len(NON_PERCENT_CATS)])
+        fga[rows] = np.maximum(draw[..., fga_index - 2].astype(np.int64), 0)
+        fta[rows] = np.maximum(draw[..., fta_index - 2].astype(np.int64), 0)
+        sample[rows, :, 2:] = np.rint(draw) if integer else draw
+    if integer:
+        sample[..., fga_index] = fga
+        sample[..., fta_index] = fta
     ftp = np.random.beta(1. + team[0]['TFTM'], 1. + team[0]['TFTA'] - team[0]['TFTM'],
-        [num_samples, len(team[0])])
+        [num_samples, num_players])
     fgp = np.random.beta(1. + team[0]['TFGM'], 1. + team[0]['TFGA'] - team[0]['TFGM'],
-        [num_samples, len(team[0])])
+        [num_samples, num_players])
     fgp[np.isnan(fgp)] = 0.
     ftp[np.isnan(ftp)] = 0.
-    fga = np.maximum(sample[..., NON_PERCENT_CATS.index('FGA')].astype(np.int64), 0)
-    fta = np.maximum(sample[..., NON_PERCENT_CATS.index('FTA')].astype(np.int64), 0)
-    fgm = np.random.binomial(fga, fgp)
-    ftm = np.random.binomial(fta, ftp)
-    projected['FGM'] = fgm.mean(axis=0)
-    projected['FTM'] = ftm.mean(axis=0)
+    for rows in chunks:
+        sample[rows, :, 0] = np.random.binomial(fga[rows], fgp[rows])
+    for rows in chunks:
+        sample[rows, :, 1] = np.random.binomial(fta[rows], ftp[rows])
+    return sample
+
+def project(mean, sample_mean):
+    projected = mean.copy()
+    projected[['FGM', 'FTM'] + NON_PERCENT_CATS] = sample_mean
     projected['FG%'] = projected['FGM'] / projected['FGA']
     projected['FT%'] = projected['FTM'] / projected['FTA']
     cols = ['Num Games', 'FGM', 'FGA', 'FG%', 'FTM', 'FTA', 'FT%', '3PTM', 'PTS', 'REB',
         'AST', 'ST', 'BLK', 'TO']
-    projected = projected[cols]
-    sample = np.concatenate([fgm[..., None], ftm[..., None], sample], axis=-1)
-    return sample, projected
+    return projected[cols]
+
+def team_categories(team):
+    return total_categories(team.sum(axis=1))
+
+def total_categories(team):
+    fg_percent = (team[..., 0] / team[..., 2])
+    ft_percent = (team[..., 1] / team[..., 3])
+    return np.concatenate([fg_percent[..., None], ft_percent[..., None], team[..., 4:]], -1)
+
+def score_categories(cats):
+    return (cats[0][..., :-1] > cats[1][..., :-1]).sum(axis=-1) + (cats[0][..., -1] < cats[1][..., -1]).astype(np.int64)
 
 def score_teams(team1, team2):
-    cats = []
-    for i, team in enumerate([team1, team2]):
-        team = team.sum(axis=1)
-        fg_percent = (team[..., 0] / team[..., 2])
-        ft_percent = (team[..., 1] / team[..., 3])
-        cats.append(np.concatenate([fg_percent[..., None], ft_percent[..., None], team[..., 4:]], -1))
-    cats = np.stack(cats)
-    scores = (cats[0][..., :-1] > cats[1][..., :-1]).sum(axis=-1) + (cats[0][..., -1] < cats[1][..., -1]).astype(np.int64)
-    return cats, scores
+    cats = np.stack([team_categories(team) for team in [team1, team2]])
+    return cats, score_categories(cats)
+
+class QuantileSketch(object):
+
+    def __init__(self, size=10000, seed=0):
+        self.size = size
+        self.count = 0
+        self.reservoir = None
+        self.random = np.random.RandomState(seed)
+
+    def update(self, values):
+        if self.reservoir is None:
+            self.reservoir = np.empty((self.size,) + values.shape[1:])
+        fill = min(max(self.size - self.count, 0), len(values))
+        self.reservoir[self.count:self.count + fill] = values[:fill]
+        seen = np.arange(self.count + fill, self.count + len(values)) + 1
+        if len(seen) > 0:
+            slots = self.random.randint(0, seen)
+            keep = slots < self.size
+            self.reservoir[slots[keep]] = values[fill:][keep]
+        self.count += len(values)
+
+    def quantile(self, q):
+        return np.quantile(self.reservoir[:min(self.count, self.size)], q, axis=0)
+
+class MatchupSummary(object):
+
+    def __init__(self, quantiles=False, sketch_size=10000):
+        self.num_samples = 0
+        self.point_counts = np.zeros(len(CATEGORY_NAMES) + 1, dtype=np.int64)
+        self.category_wins = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)
+        self.category_totals = np.zeros([2, len(CATEGORY_NAMES)])
+        self.sketch = QuantileSketch(sketch_size) if quantiles else None
+        self.projections = None
+
+    def update(self, cats, points):
+        self.num_samples += len(points)
+        self.point_counts += np.bincount(points, minlength=len(self.point_counts))
+        self.category_wins += np.concatenate([
+            (cats[0, :, :-1] > cats[1, :, :-1]).sum(axis=0),
+            (cats[0, :, -1:] < cats[1, :, -1:]).sum(axis=0),
+        ])
+        self.category_totals += cats.sum(axis=1)
+        if self.sketch is not None:
+            self.sketch.update(np.moveaxis(cats, 1, 0))
+        return self
+
+    @property
+    def point_probabilities(self):
+        return self.point_counts / self.num_samples
+
+    @property
+    def win_probability(self):
+        return self.point_probabilities[5:].sum()
+
+    @property
+    def expected_points(self):
+        return (np.arange(len(self.point_counts)) * self.point_probabilities).sum()
+
+    @property
+    def points_std(self):
+        points = np.arange(len(self.point_counts))
+        return np.sqrt((points ** 2 * self.point_probabilities).sum()
+                       - self.expected_points ** 2)
+
+    @property
+    def category_means(self):
+        return self.category_totals / self.num_samples
+
+    @property
+    def category_probabilities(self):
+        return self.category_wins / self.num_samples
+
+    def quantiles(self, q):
+        if self.sketch is None:
+            raise ValueError("Summary was built without quantile sketches")
+        return self.sketch.quantile(q)
+
+def stream_h2h(roster1, roster2, week=CURRENT_WEEK, num_days=14,
+               num_samples=10000, decay_rate=0.1,
+               include_bench=False,
+               include_injured=False,
+               sample_bank=None,
+               dtype=np.float64,
+               chunk_size=10000,
+               quantiles=False,
+               daily=False):
+    if sample_bank is not None:
+        raise ValueError("Streaming simulation draws its own samples")
+    base = week_start(week)
+    teams = []
+    if daily:
+        from .daily import daily_teams
+        teams = [(mean, std, valid) for mean, std, valid, _ in daily_teams(
+            roster1, roster2, base, num_days=num_days, decay_rate=decay_rate,
+            include_injured=include_injured)]
+    for team in [] if daily else [roster1, roster2]:
+        mean, std, models = fit_roster(team, base, num_days=num_days,
+                                       decay_rate=decay_rate)
+        valid = np.zeros(len(mean), dtype=bool)
+        valid[starter_index(team, models, include_bench=include_bench,
+                            include_injured=include_injured)] = True
+        teams.append((mean, std, valid))
+    summary = MatchupSummary(quantiles=quantiles)
+    totals = [np.zeros([valid.sum(), len(CATS)]) for _, _, valid in teams]
+    for start in range(0, num_samples, chunk_size):
+        size = min(chunk_size, num_samples - start)
+        scores = [sample_stats((mean[valid], std[valid]), num_samples=size,
+                               dtype=dtype)
+                  for mean, std, valid in teams]
+        for total, score in zip(totals, scores):
+            total += score.sum(axis=0)
+        summary.update(*score_teams(*scores))
+    summary.projections = []
+    for (mean, _, valid), total in zip(teams, totals):
+        sample_mean = expected_stats(mean)
+        sample_mean[valid] = total / num_samples
+        summary.projections.append(project(mean, sample_mean))
+    return summary
+
+def simulate_summary(roster1, roster2, chunk_size=None, quantiles=False,
+                     **kwargs):
+    if chunk_size is not None:
+        return stream_h2h(roster1, roster2, chunk_size=chunk_size,
+                          quantiles=quantiles, **kwargs)
+    cats, points, _, projections = simulate_h2h(roster1, roster2, **kwargs)
+    summary = MatchupSummary(quantiles=quantiles).update(cats, points)
+    summary.projections = projections
+    return summary
+
+def league_matrix(rosters, week=CURRENT_WEEK, num_days=14,
+                  num_samples=10000, decay_rate=0.1,
+                  include_bench=False,
+                  include_injured=False,
+                  sample_bank=None,
+                  dtype=np.float64,
+                  chunk_size=10000):
+    check_sample_bank(sample_bank, num_samples)
+    base = week_start(week)
+    teams = []
+    for roster in rosters:
+        mean, std, models = fit_roster(roster, base, num_days=num_days,
+                                       decay_rate=decay_rate)
+        valid_index = starter_index(roster, models, include_bench=include_bench,
+                                    include_injured=include_injured)
+        if sample_bank is None:
+            valid = np.zeros(len(mean), dtype=bool)
+            valid[valid_index] = True
+            teams.append((mean[valid], std[valid]))
+        else:
+            sample_bank.add(models, mean, std)
+            teams.append([models[i] for i in valid_index])
+    wins = np.zeros([len(teams), len(teams)], dtype=np.int64)
+    category_wins = np.zeros([len(teams), len(teams), len(CATEGORY_NAMES)],
+                             dtype=np.int64)
+    for start in range(0, num_samples, chunk_size):
+        rows = slice(start, min(start + chunk_size, num_samples))
+        if sample_bank is None:
+            cats = np.stack([team_categories(sample_stats(
+                team, num_samples=rows.stop - rows.start, dtype=dtype))
+                for team in teams])
+        else:
+            cats = np.stack([team_categories(sample_bank.gather(team, rows))
+                             for team in teams])
+        beats = np.concatenate([
+            cats[:, None, :, :-1] > cats[None, :, :, :-1],
+            cats[:, None, :, -1:] < cats[None, :, :, -1:],
+        ], axis=-1)
+        wins += (beats.sum(axis=-1) >= 5).sum(axis=-1)
+        category_wins += beats.sum(axis=2)
+    win_probability = wins / num_samples
+    category_probabilities = category_wins / num_samples
+    diagonal = np.arange(len(teams))
+    win_probability[diagonal, diagonal] = np.nan
+    category_probabilities[diagonal, diagonal] = np.nan
+    return win_probability, category_probabilities
@@ -1,12 +1,15 @@
 import itertools as it
+import time
+import asyncio
 from yaspin import yaspin
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
-from multiprocessing.dummy import Pool
 import datetime
 from functools import partial
 from .yfs import yfs, LEAGUE_KEY
+from .fetch import get_engine
+from .replay import today
+from .store import GameLogStore, ScheduleStore, ScheduleEntry
 
 STAT_MAP = {
     'MINUTES_PLAYED': 'MP',
@@ -94,43 +97,126 @@ def get_stat_day(date, player_keys):
 SCHEDULE_URL = "https://sports.yahoo.com/site/api/resource/sports.team.schedule;count=250;sched_state_alias=current_with_postseason;team_key={team_key}"
 STATS_URL = "https://graphite-secure.sports.yahoo.com/v1/query/shangrila/gameLogBasketball?lang=en-US&playerId={player_key}&season=2021"
 
-def get_all_stats(player_key, team_key, player_name):
-    with yaspin(text="Getting stats for %s" % player_name, color='cyan'):
-        player_key = "nba" + player_key[3:]
-        team_key = "nba" + team_key[3:]
-        response = requests.get(STATS_URL.format(player_key=player_key)).json()
-        results = response['data']['players'][0]['playerGameStats']
-        games = {}
-        for game in results:
-            game_date = datetime.datetime.strptime(game['game']['startTime'][:10], "%Y-%m-%d").date()
-            stats = {}
-            for stat in game['stats']:
-                if stat['statId'] in STAT_MAP:
-                    try:
-                        stats[STAT_MAP[stat['statId']]] = float(stat['value'])
-                    except:
-                        stats[STAT_MAP[stat['statId']]] = stat['value']
-            stats["GP"] = 1.
-            games[game_date] = stats
-        response = requests.get(SCHEDULE_URL.format(team_key=team_key)).json()
-        results = response['service']['schedule']['games']
+GAME_LOGS = GameLogStore()
+
+async def run_blocking(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+async def fetch_game_log(player_key):
+    response = (await get_engine().fetch(STATS_URL.format(player_key=player_key))).json()
+    results = response['data']['players'][0]['playerGameStats']
+    games = {}
+    for game in results:
+        game_date = datetime.datetime.strptime(game['game']['startTime'][:10], "%Y-%m-%d").date()
+        stats = {}
+        for stat in game['stats']:
+            if stat['statId'] in STAT_MAP:
+                try:
+                    stats[STAT_MAP[stat['statId']]] = float(stat['value'])
+                except:
+                    stats[STAT_MAP[stat['statId']]] = stat['value']
+        stats["GP"] = 1.
+        games[game_date] = stats
+    return games
+
+async def load_game_log(player_key, until=None):
+    current_date = today()
+    if until is None:
+        until = current_date
+    synced_on = await run_blocking(GAME_LOGS.synced_on, player_key)
+    if synced_on is None or synced_on < until:
+        last_game = await run_blocking(GAME_LOGS.last_game, player_key)
+        games = await fetch_game_log(player_key)
+        await run_blocking(GAME_LOGS.update, player_key, {
+            date: stats for date, stats in games.items()
+            if date < current_date and (last_game is None or date > last_game)
+        }, current_date)
+    return await run_blocking(GAME_LOGS.games, player_key)
+
+def get_game_log(player_key, until=None):
+    return get_engine().run(load_game_log(player_key, until=until))
+
+SCHEDULE_TTL = 12 * 60 * 60
+
+class ScheduleCache(object):
+
+    def __init__(self, store, ttl=SCHEDULE_TTL):
+        self.store = store
+        self.ttl = ttl
+        self.schedules = {}
+        self._pending = {}
+
+    def is_fresh(self, entry):
+        return entry is not None and time.time() - entry.fetched_at < self.ttl
+
+    def get(self, team_key):
+        return get_engine().run(self.load(team_key))
+
+    async def load(self, team_key):
+        entry = self.schedules.get(team_key)
+        if self.is_fresh(entry):
+            return entry.dates
+        task = self._pending.get(team_key)
+        if task is None:
+            task = self._pending[team_key] = asyncio.ensure_future(
+                self.refresh(team_key, entry))
+            task.add_done_callback(lambda _: self._pending.pop(team_key, None))
+        return (await task).dates
+
+    async def refresh(self, team_key, entry):
+        if entry is None:
+            entry = await run_blocking(self.store.get, team_key)
+        if not self.is_fresh(entry):
+            entry = await self.fetch(team_key, entry)
+            await run_blocking(self.store.update, team_key, entry)
+        self.schedules[team_key] = entry
+        return entry
+
+    async def fetch(self, team_key, entry=None):
+        headers = {}
+        if entry is not None and entry.etag is not None:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified is not None:
+            headers['If-Modified-Since'] = entry.last_modified
+        response = await get_engine().fetch(SCHEDULE_URL.format(team_key=team_key),
+                                            headers=headers)
+        if response.status_code == 304 and entry is not None:
+            return entry._replace(fetched_at=time.time())
+        results = response.json()['service']['schedule']['games']
         dates = set()
         for game in results:
             dates.add(datetime.datetime.strptime(game[6:-2], "%Y%m%d").date())
-        return games, dates
+        return ScheduleEntry(dates, response.headers.get('ETag'),
+                             response.headers.get('Last-Modified'), time.time())
+
+SCHEDULES = ScheduleCache(ScheduleStore())
+
+async def load_all_stats(player_key, team_key, until=None):
+    player_key = "nba" + player_key[3:]
+    team_key = "nba" + team_key[3:]
+    return await asyncio.gather(load_game_log(player_key, until=until),
+                                SCHEDULES.load(team_key))
+
+def get_all_stats(player_key, team_key, player_name, until=None):
+    with yaspin(text="Getting stats for %s" % player_name, color='cyan'):
+        return tuple(get_engine().run(load_all_stats(player_key, team_key,
+                                                     until=until)))
 
 def convert_stat(stat):
     out = Stats.from_dict(stat)
     return out
 
-def get_stats(players, base_date=datetime.date.today(), num_days=7, num_threads=10, week_length=7):
-    player_info = [(p.player_key, p.team_key, p.name) for p in players]
-    base = base_date
-    date_list = set([min(base, datetime.date.today()) - datetime.timedelta(days=x + 1) for x in range(num_days)])
+def get_stats(players, base_date=None, num_days=7, week_length=7):
+    base = base_date if base_date is not None else today()
+    until = min(base, today())
+    date_list = set([until - datetime.timedelta(days=x + 1) for x in range(num_days)])
     week_dates = set([base + datetime.timedelta(days=x) for x in range(week_length)])
-    pool = Pool(num_threads)
-    game_stats = pool.starmap(get_all_stats, player_info)
-    #game_stats = list(it.starmap(get_all_stats, player_info))
+    async def load_players():
+        return await asyncio.gather(*[
+            load_all_stats(p.player_key, p.team_key, until=until) for p in players
+        ])
+    with yaspin(text="Getting stats for %u players" % len(players), color='cyan'):
+        game_stats = get_engine().run(load_players())
     date_stats, games = [], []
     for player, (stats, dates) in zip(players, game_stats):
         stats = {date: convert_stat(stat) for date, stat in stats.items() if date in
@@ -142,14 +228,19 @@ def get_stats(players, base_date=datetime.date.today(), num_days=7, num_threads=
 
 NOTE_URL = 'https://basketball.fantasysports.yahoo.com/nba/160419/playernote?init=1&view=notes&pid={player_id}'
 
-def get_player_games(player_id, start_date, end_date):
-    soup = BeautifulSoup(requests.get(NOTE_URL.format(player_id=player_id)).json()["content"], features="html.parser")
-    today = datetime.datetime.now()
-    dates = [datetime.datetime.strptime(s.text + " " + str(today.year), "%b %d %Y") for s in soup.find_all("td", {"class": "date first"})]
+def parse_player_games(response, start_date, end_date):
+    soup = BeautifulSoup(response.json()["content"], features="html.parser")
+    dates = [datetime.datetime.strptime(s.text + " " + str(today().year), "%b %d %Y") for s in soup.find_all("td", {"class": "date first"})]
     dates = [d for d in dates if
              start_date <= d.date() < end_date]
     return dates
 
-def get_games(player_ids, start_date, end_date, num_threads=10):
-    pool = Pool(num_threads)
-    return pool.map(partial(get_player_games, start_date=start_date, end_date=end_date), player_ids)
+def get_player_games(player_id, start_date, end_date):
+    response = get_engine().get(NOTE_URL.format(player_id=player_id))
+    return parse_player_games(response, start_date, end_date)
+
+def get_games(player_ids, start_date, end_date):
+    responses = get_engine().get_all([NOTE_URL.format(player_id=player_id)
+                                      for player_id in player_ids])
+    return [parse_player_games(response, start_date, end_date)
+            for response in responses]
@@ -0,0 +1,205 @@
+import os
+import json
+import atexit
+import shutil
+import tempfile
+import sqlite3
+import datetime
+import threading
+import time
+from collections import namedtuple
+
+from .replay import HTTP_MODE
+
+__all__ = ['CACHE_DIR', 'GameLogStore', 'ScheduleStore', 'ScheduleEntry',
+           'MetadataStore', 'LEAGUE_METADATA', 'invalidate_league_cache']
+
+if HTTP_MODE == 'live':
+    CACHE_DIR = os.environ.get(
+        'NBA_MATCHUP_CACHE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'nba_matchup')
+    )
+else:
+    CACHE_DIR = tempfile.mkdtemp(prefix='nba_matchup_')
+    atexit.register(shutil.rmtree, CACHE_DIR, True)
+
+METADATA_TTL = {
+    'league': 60 * 60,
+    'teams': 24 * 60 * 60,
+    'roster': 60 * 60,
+    'matchups': 24 * 60 * 60,
+    'standings': 60 * 60,
+}
+
+ScheduleEntry = namedtuple('ScheduleEntry', ['dates', 'etag', 'last_modified',
+                                             'fetched_at'])
+
+class SQLiteStore(object):
+
+    TABLES = []
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(CACHE_DIR, 'store.sqlite')
+        self.path = path
+        self._initialized = False
+        self._write_lock = threading.Lock()
+
+    def connect(self):
+        if not self._initialized:
+            with self._write_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    conn = sqlite3.connect(self.path, timeout=60)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        with conn:
+                            for table in self.TABLES:
+                                conn.execute("CREATE TABLE IF NOT EXISTS %s" % table)
+                    finally:
+                        conn.close()
+                    self._initialized = True
+        return sqlite3.connect(self.path, timeout=60)
+
+    def execute(self, statements):
+        with self._write_lock:
+            conn = self.connect()
+            try:
+                with conn:
+                    for query, args in statements:
+                        if isinstance(args, list):
+                            conn.executemany(query, args)
+                        else:
+                            conn.execute(query, args)
+            finally:
+                conn.close()
+
+    def fetchone(self, query, args):
+        conn = self.connect()
+        try:
+            return conn.execute(query, args).fetchone()
+        finally:
+            conn.close()
+
+    def fetchall(self, query, args):
+        conn = self.connect()
+        try:
+            return conn.execute(query, args).fetchall()
+        finally:
+            conn.close()
+
+class GameLogStore(SQLiteStore):
+
+    TABLES = [
+        "games (player_key TEXT, game_date TEXT, stats TEXT, "
+        "PRIMARY KEY (player_key, game_date))",
+        "game_syncs (player_key TEXT PRIMARY KEY, synced_on TEXT)",
+    ]
+
+    def synced_on(self, player_key):
+        row = self.fetchone("SELECT synced_on FROM game_syncs WHERE player_key = ?",
+                            (player_key,))
+        if row is None:
+            return None
+        return datetime.date.fromisoformat(row[0])
+
+    def last_game(self, player_key):
+        row = self.fetchone("SELECT MAX(game_date) FROM games WHERE player_key = ?",
+                            (player_key,))
+        if row[0] is None:
+            return None
+        return datetime.date.fromisoformat(row[0])
+
+    def games(self, player_key):
+        rows = self.fetchall("SELECT game_date, stats FROM games WHERE player_key = ?",
+                             (player_key,))
+        return {datetime.date.fromisoformat(date): json.loads(stats)
+                for date, stats in rows}
+
+    def update(self, player_key, games, synced_on):
+        self.execute([
+            ("INSERT OR REPLACE INTO games VALUES (?, ?, ?)", [
+                (player_key, date.isoformat(), json.dumps(stats))
+                for date, stats in games.items()
+            ]),
+            ("INSERT OR REPLACE INTO game_syncs VALUES (?, ?)",
+             (player_key, synced_on.isoformat())),
+        ])
+
+class ScheduleStore(SQLiteStore):
+
+    TABLES = [
+        "schedules (team_key TEXT PRIMARY KEY, dates TEXT, etag TEXT, "
+        "last_modified TEXT, fetched_at REAL)",
+    ]
+
+    def get(self, team_key):
+        row = self.fetchone("SELECT dates, etag, last_modified, fetched_at "
+                            "FROM schedules WHERE team_key = ?", (team_key,))
+        if row is None:
+            return None
+        dates, etag, last_modified, fetched_at = row
+        return ScheduleEntry({datetime.date.fromisoformat(d) for d in json.loads(dates)},
+                             etag, last_modified, fetched_at)
+
+    def update(self, team_key, entry):
+        self.execute([
+            ("INSERT OR REPLACE INTO schedules VALUES (?, ?, ?, ?, ?)", (
+                team_key, json.dumps(sorted(d.isoformat() for d in entry.dates)),
+                entry.etag, entry.last_modified, entry.fetched_at)),
+        ])
+
+class MetadataStore(SQLiteStore):
+
+    TABLES = [
+        "metadata (kind TEXT, league_key TEXT, team_key TEXT, week INTEGER, "
+        "body TEXT, fetched_at REAL, PRIMARY KEY (kind, league_key, team_key, week))",
+    ]
+
+    def __init__(self, path=None, ttl=METADATA_TTL):
+        super(MetadataStore, self).__init__(path=path)
+        self.ttl = ttl
+
+    @staticmethod
+    def key(kind, league_key, team_key=None, week=None):
+        return (kind, league_key, '' if team_key is None else team_key,
+                -1 if week is None else int(week))
+
+    def get(self, kind, league_key, team_key=None, week=None):
+        row = self.fetchone("SELECT body, fetched_at FROM metadata WHERE kind = ? "
+                            "AND league_key = ? AND team_key = ? AND week = ?",
+                            self.key(kind, league_key, team_key, week))
+        if row is None or time.time() - row[1] >= self.ttl.get(kind, 0):
+            return None
+        return json.loads(row[0])
+
+    def put(self, kind, league_key, body, team_key=None, week=None):
+        self.execute([
+            ("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?)",
+             self.key(kind, league_key, team_key, week) + (json.dumps(body), time.time())),
+        ])
+
+    def cached(self, kind, league_key, fetch, team_key=None, week=None):
+        body = self.get(kind, league_key, team_key=team_key, week=week)
+        if body is None:
+            body = fetch()
+            self.put(kind, league_key, body, team_key=team_key, week=week)
+        return body
+
+    def invalidate(self, league_key=None, team_key=None, week=None, kind=None):
+        conditions, args = [], []
+        for column, value in [('kind', kind), ('league_key', league_key),
+                              ('team_key', team_key), ('week', week)]:
+            if value is not None:
+                conditions.append("%s = ?" % column)
+                args.append(value)
+        query = "DELETE FROM metadata"
+        if len(conditions) > 0:
+            query += " WHERE " + " AND ".join(conditions)
+        self.execute([(query, tuple(args))])
+
+LEAGUE_METADATA = MetadataStore()
+
+def invalidate_league_cache(league_key=None, team_key=None, week=None, kind=None):
+    LEAGUE_METADATA.invalidate(league_key=league_key, team_key=team_key,
+                               week=week, kind=kind)
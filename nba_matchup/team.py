@@ -1,15 +1,18 @@
 import datetime
 import random
+from array import array
 
 import pandas as pd
 from yaspin import yaspin
 
-from .yfs import yfs, CURRENT_WEEK
+from .yfs import yfs, CURRENT_WEEK, LEAGUE_KEY
+from .store import LEAGUE_METADATA
+from .replay import today
 from .player import Player
 from .stats import get_stats
 from .util import valid_starters
 
-__all__ = ['get_teams']
+__all__ = ['get_teams', 'PlayerTable', 'CompactRoster', 'PLAYER_TABLE']
 
 TEAM = {
     'G': 1,
@@ -97,13 +100,17 @@ class Roster(object):
             if name == player.name:
                 return player
 
-    def stats(self, num_days=14, base_date=datetime.date.today(), week_length=7):
-        if any(s._stats is None for s in self):
-            for player, stats in zip(self, get_stats(self,
-                                                     num_days=num_days,
-                                                     base_date=base_date,
-                                                     week_length=week_length)):
-                player.set_stats(stats)
+    def stats(self, num_days=14, base_date=None, week_length=7):
+        if base_date is None:
+            base_date = today()
+        window = (base_date, num_days, week_length)
+        stale = [p for p in self if not p.has_stats(window)]
+        if len(stale) > 0:
+            for player, stats in zip(stale, get_stats(stale,
+                                                      num_days=num_days,
+                                                      base_date=base_date,
+                                                      week_length=week_length)):
+                player.set_stats(stats, window=window)
         stats = []
         for player in self:
             stat = player.stats[0]
@@ -114,6 +121,169 @@ class Roster(object):
         games = [p.stats[1] for p in self]
         return stats, games
 
+STARTING_SLOTS = [slot for slot, count in TEAM.items() for _ in range(count)]
+
+SLOTS = ['BN', 'IL'] + list(TEAM)
+SLOT_INDEX = {slot: i for i, slot in enumerate(SLOTS)}
+BENCH, INJURED = SLOT_INDEX['BN'], SLOT_INDEX['IL']
+FIRST_STARTER = 2
+SLOT_COUNTS = [0, 0] + list(TEAM.values())
+
+def slot_index(position):
+    if position not in SLOT_INDEX:
+        raise ValueError("Unknown roster position: %s" % position)
+    return SLOT_INDEX[position]
+
+class PlayerTable(object):
+
+    def __init__(self, players=()):
+        self.players = []
+        self.index = {}
+        self.eligible = []
+        self.injured = []
+        for player in players:
+            self.add(player)
+
+    def __len__(self):
+        return len(self.players)
+
+    def add(self, player):
+        if player not in self.index:
+            self.index[player] = len(self.players)
+            self.players.append(player)
+            self.eligible.append(sum(1 << i for i, slot in enumerate(SLOTS)
+                                     if slot in player.eligible_positions))
+            self.injured.append(player.status == 'INJ')
+        return self.index[player]
+
+PLAYER_TABLE = PlayerTable()
+
+class CompactRoster(object):
+
+    __slots__ = ['table', 'indices', 'slots', '_key', '_positions', '_starter_keys']
+
+    def __init__(self, table, indices, slots):
+        self.table = table
+        self.indices = array('i', indices)
+        self.slots = array('b', slots)
+        self._key = None
+        self._positions = None
+        self._starter_keys = None
+
+    @classmethod
+    def from_roster(cls, roster, table=PLAYER_TABLE):
+        return cls(table, [table.add(p) for p in roster],
+                   [slot_index(roster.positions[p]) for p in roster])
+
+    def to_roster(self):
+        return Roster(self.players, self.positions)
+
+    @property
+    def players(self):
+        return [self.table.players[i] for i in self.indices]
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            self._positions = {self.table.players[i]: SLOTS[s]
+                               for i, s in zip(self.indices, self.slots)}
+        return self._positions
+
+    def starter_mask(self, include_bench=False, include_injured=False):
+        return [s >= FIRST_STARTER or (include_bench and s == BENCH)
+                or (include_injured and s == INJURED) for s in self.slots]
+
+    def starter_keys(self):
+        if self._starter_keys is None:
+            self._starter_keys = frozenset(
+                self.table.players[i].player_key
+                for i, s in zip(self.indices, self.slots) if s >= FIRST_STARTER)
+        return self._starter_keys
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, idx):
+        return self.table.players[self.indices[idx]]
+
+    def __iter__(self):
+        for i in self.indices:
+            yield self.table.players[i]
+
+    def key(self):
+        if self._key is None:
+            self._key = tuple(sorted((i, s) for i, s in zip(self.indices, self.slots)
+                                     if s >= FIRST_STARTER))
+        return self._key
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __eq__(self, other):
+        return (isinstance(other, CompactRoster) and self.table is other.table
+                and self.key() == other.key())
+
+    def copy(self):
+        return CompactRoster(self.table, self.indices, self.slots)
+
+    def add(self, player, position):
+        return CompactRoster(self.table,
+                             self.indices + array('i', [self.table.add(player)]),
+                             self.slots + array('b', [slot_index(position)]))
+
+    def remove(self, player):
+        index = self.table.index.get(player, -1)
+        keep = [j for j, i in enumerate(self.indices) if i != index]
+        return CompactRoster(self.table, [self.indices[j] for j in keep],
+                             [self.slots[j] for j in keep])
+
+    def open_slots(self):
+        counts = SLOT_COUNTS[:]
+        for slot in self.slots:
+            counts[slot] -= 1
+        return [slot for slot, count in enumerate(counts) if count > 0]
+
+    def random_swap(self, ignore_players=set(), ignore_injured=False):
+        table, slots = self.table, self.slots
+        eligible = [table.eligible[i] for i in self.indices]
+        ignored = {table.index[p] for p in ignore_players if p in table.index}
+        blocked = [i in ignored or (ignore_injured and table.injured[i])
+                   for i in self.indices]
+        choices = [j for j, i in enumerate(self.indices)
+                   if slots[j] >= FIRST_STARTER and i not in ignored]
+        open_slots = self.open_slots()
+        if len(open_slots) > 0:
+            choices.append(-1)
+        while True:
+            choice = random.choice(choices)
+            if choice >= 0:
+                candidates = [j for j in range(len(slots)) if j != choice
+                              and not blocked[j]
+                              and eligible[j] >> slots[choice] & 1
+                              and (eligible[choice] >> slots[j] & 1
+                                   or slots[j] == BENCH)] + [None]
+            else:
+                candidates = [j for j in range(len(slots)) if slots[j] == BENCH
+                              and not blocked[j]
+                              and any(eligible[j] >> s & 1 for s in open_slots)]
+            if len(candidates) == 0:
+                continue
+            candidate = random.choice(candidates)
+            if choice >= 0 and candidate is not None and slots[candidate] >= FIRST_STARTER:
+                continue
+            new_slots = array('b', slots)
+            if candidate is None:
+                new_slots[choice] = BENCH
+            elif choice < 0:
+                new_slots[candidate] = random.choice([s for s in open_slots
+                                                      if eligible[candidate] >> s & 1])
+            else:
+                new_slots[candidate], new_slots[choice] = slots[choice], slots[candidate]
+            return CompactRoster(table, self.indices, new_slots)
+
+    player_by_name = Roster.player_by_name
+    stats = Roster.stats
+
 class Team(object):
 
     def __init__(self, team_key, team_id, name,
@@ -130,21 +300,22 @@ class Team(object):
         self.waiver_priority = waiver_priority
         self.manager_name = manager_name
         self.manager_id = manager_id
-        self._roster = None
+        self._rosters = {}
         self._stats = {}
 
     def roster(self, week=None):
-        if self._roster is None:
-            self._roster = get_roster(self.team_key, week=week)
-        return self._roster
+        if week not in self._rosters:
+            self._rosters[week] = get_roster(self.team_key, week=week)
+        return self._rosters[week]
 
-    def set_roster(self, roster):
-        self._roster = roster
+    def set_roster(self, roster, week=None):
+        self._rosters[week] = roster
 
-    def valid_starters(self, ignore_players=set()):
-        possible_starters = [player for player in self.roster if player not in
-                             ignore_players]
-        return valid_starters(possible_starters)
+    def valid_starters(self, ignore_players=set(), week=None,
+                       ignore_injured=False):
+        return valid_starters(self.roster(week=week).players,
+                              ignore_players=ignore_players,
+                              ignore_injured=ignore_injured)
 
     @classmethod
     def from_dict(cls, team_dict):
@@ -171,33 +342,38 @@ class Team(object):
         )
 
 def get_teams(league_key):
-    with yaspin(text="Fetching teams", color='cyan'):
-        teams_json = yfs.get_leagues_teams([league_key]).json()
-        for key, value in teams_json['fantasy_content']['leagues']['0']['league'][1]['teams'].items():
-            if key == 'count':
-                continue
-            team_props = value['team'][0]
-            team_dict = {}
-            for prop in team_props:
-                if isinstance(prop, dict):
-                    for k, v in prop.items():
-                        team_dict[k] = v
-            yield Team.from_dict(team_dict)
+    def fetch():
+        with yaspin(text="Fetching teams", color='cyan'):
+            return yfs.get_leagues_teams([league_key]).json()
+    teams_json = LEAGUE_METADATA.cached('teams', league_key, fetch)
+    for key, value in teams_json['fantasy_content']['leagues']['0']['league'][1]['teams'].items():
+        if key == 'count':
+            continue
+        team_props = value['team'][0]
+        team_dict = {}
+        for prop in team_props:
+            if isinstance(prop, dict):
+                for k, v in prop.items():
+                    team_dict[k] = v
+        yield Team.from_dict(team_dict)
 
 def get_roster(team_key, week=None):
-    with yaspin(text="Fetching team rosters", color='cyan'):
-        roster_props = yfs.get_teams_roster([team_key], week=week).json()['fantasy_content']['teams']['0']['team']
-        roster = []
-        for key, value in roster_props[1]['roster']['0']['players'].items():
-            if key == 'count':
-                continue
-            player_dict = {}
-            for prop in value['player'][0]:
-                if isinstance(prop, dict):
-                    for k, v in prop.items():
-                        player_dict[k] = v
-            player_dict['selected_position'] = (
-                value['player'][1]['selected_position'][1]['position']
-            )
-            roster.append(Player.from_dict(player_dict))
-        return Roster(roster, {p: p.selected_position for p in roster})
+    def fetch():
+        with yaspin(text="Fetching team rosters", color='cyan'):
+            return yfs.get_teams_roster([team_key], week=week).json()
+    roster_props = LEAGUE_METADATA.cached('roster', LEAGUE_KEY, fetch,
+                                          team_key=team_key, week=week)['fantasy_content']['teams']['0']['team']
+    roster = []
+    for key, value in roster_props[1]['roster']['0']['players'].items():
+        if key == 'count':
+            continue
+        player_dict = {}
+        for prop in value['player'][0]:
+            if isinstance(prop, dict):
+                for k, v in prop.items():
+                    player_dict[k] = v
+        player_dict['selected_position'] = (
+            value['player'][1]['selected_position'][1]['position']
+        )
+        roster.append(Player.from_dict(player_dict))
+    return Roster(roster, {p: p.selected_position for p in roster})
@@ -0,0 +1,204 @@
+import itertools
+import numpy as np
+from nba_matchup import CURRENT_WEEK
+
+from .team import STARTING_SLOTS, Roster
+from .sim import fit_players, starter_index, week_start
+from .analytic import (player_moments, team_moments, totals_moments,
+                       category_probabilities, points_distribution, MOMENTS_SIZE)
+from .opt import METRICS
+from .pool import WorkerPool, worker_state
+
+__all__ = ['TradeState', 'TradeSearch', 'league_scores']
+
+class TradeState(object):
+
+    def __init__(self, rosters, team, week=CURRENT_WEEK, num_days=14,
+                 decay_rate=0.1, ignore_injured=True, partners=None):
+        self.rosters = rosters
+        self.team = team
+        base = week_start(week)
+        self.moments, self.eligible, self.active = [], [], []
+        opponent_moments = []
+        for roster in rosters:
+            models = fit_players(roster, base, num_days=num_days,
+                                 decay_rate=decay_rate)
+            active = np.array([model.games_played > 0 for model in models])
+            moments = np.zeros([len(roster.players) + 1, MOMENTS_SIZE])
+            for i, model in enumerate(models):
+                if active[i]:
+                    moments[i] = player_moments(model)
+            eligible = np.array([[
+                active[i] and roster.positions[player] != 'IL'
+                and not (ignore_injured and player.status == 'INJ')
+                and slot in player.eligible_positions
+                for slot in STARTING_SLOTS] for i, player in enumerate(roster.players)
+            ], dtype=bool).reshape([len(roster.players), len(STARTING_SLOTS)])
+            self.moments.append(moments)
+            self.eligible.append(eligible)
+            self.active.append(active)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                opponent_moments.append(team_moments(
+                    [models[i] for i in starter_index(roster, models)]))
+        self.opponent_mean = np.array([m[0] for m in opponent_moments])
+        self.opponent_variance = np.array([m[1] for m in opponent_moments])
+        self.base, self.upgrades = {}, {}
+        for partner in range(len(rosters)) if partners is None else partners:
+            if partner != team:
+                self.base[team, partner] = self.best_lineup(team, partner)
+                self.base[partner, team] = self.best_lineup(partner, team)
+                self.upgrades[team, partner] = self.find_upgrades(team, partner)
+                self.upgrades[partner, team] = self.find_upgrades(partner, team)
+
+    def value(self, totals, exclude):
+        opponents = [j for j in range(len(self.rosters)) if j not in exclude]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean, variance = totals_moments(totals)
+        probs = category_probabilities(
+            (mean[:, None], variance[:, None]),
+            (self.opponent_mean[None, opponents], self.opponent_variance[None, opponents]))
+        return points_distribution(probs)[..., 5:].sum(axis=-1).mean(axis=-1)
+
+    def improve(self, moments, eligible, assignment, value, exclude, movers=None):
+        assignment = assignment.copy()
+        while True:
+            starters = set(assignment[assignment >= 0])
+            players = [p for p in range(len(eligible)) if p not in starters
+                       and (movers is None or p in movers)]
+            moves = [(s, p) for s in range(len(STARTING_SLOTS)) for p in players
+                     if eligible[p, s]]
+            if len(moves) == 0:
+                break
+            slots, players = np.array(moves).T
+            totals = (moments[assignment].sum(axis=0)[None]
+                      - moments[assignment[slots]] + moments[players])
+            values = self.value(totals, exclude)
+            best = int(np.argmax(values))
+            if values[best] <= value:
+                break
+            assignment[slots[best]] = players[best]
+            value = values[best]
+            movers = None
+        return assignment, value
+
+    def initial_lineup(self, team):
+        roster = self.rosters[team]
+        assignment = -np.ones(len(STARTING_SLOTS), dtype=np.int64)
+        for i, player in enumerate(roster.players):
+            for s, slot in enumerate(STARTING_SLOTS):
+                if (roster.positions[player] == slot and assignment[s] < 0
+                        and self.eligible[team][i, s]):
+                    assignment[s] = i
+                    break
+        return assignment
+
+    def best_lineup(self, team, partner):
+        moments = self.moments[team]
+        assignment = self.initial_lineup(team)
+        value = self.value(moments[assignment].sum(axis=0)[None], {team, partner})[0]
+        return self.improve(moments, self.eligible[team], assignment, value,
+                            {team, partner})
+
+    def find_upgrades(self, team, partner):
+        assignment, value = self.base[team, partner]
+        moves = [(s, p) for p in np.flatnonzero(self.active[partner])
+                 for s in range(len(STARTING_SLOTS)) if self.eligible[partner][p, s]]
+        if len(moves) == 0:
+            return set()
+        slots, players = np.array(moves).T
+        moments = self.moments[team]
+        totals = (moments[assignment].sum(axis=0)[None]
+                  - moments[assignment[slots]] + self.moments[partner][players])
+        values = self.value(totals, {team, partner})
+        return set(players[values > value].tolist())
+
+    def unchanged(self, team, partner, outgoing, incoming):
+        starters = self.base[team, partner][0]
+        return (not any(i in starters for i in outgoing)
+                and self.upgrades[team, partner].isdisjoint(incoming))
+
+    def side(self, team, partner, outgoing, incoming):
+        keep = [i for i in range(len(self.eligible[team])) if i not in outgoing]
+        moments = np.concatenate([self.moments[team][keep],
+                                  self.moments[partner][list(incoming)],
+                                  np.zeros([1, MOMENTS_SIZE])])
+        eligible = np.concatenate([self.eligible[team][keep],
+                                   self.eligible[partner][list(incoming)]])
+        index = -np.ones(len(self.eligible[team]) + 1, dtype=np.int64)
+        index[keep] = np.arange(len(keep))
+        base_assignment, base_value = self.base[team, partner]
+        assignment = index[base_assignment]
+        movers = set(range(len(keep), len(keep) + len(incoming)))
+        if (assignment >= 0).sum() == (base_assignment >= 0).sum():
+            value = base_value
+        else:
+            value = self.value(moments[assignment].sum(axis=0)[None], {team, partner})[0]
+            movers = None
+        assignment, value = self.improve(moments, eligible, assignment, value,
+                                         {team, partner}, movers=movers)
+        return value - base_value, tuple(assignment)
+
+    def packages(self, partner, max_size=2):
+        mine = np.flatnonzero(self.active[self.team])
+        theirs = np.flatnonzero(self.active[partner])
+        for size in range(1, max_size + 1):
+            for outgoing in itertools.combinations(mine, size):
+                for incoming in itertools.combinations(theirs, size):
+                    yield outgoing, incoming
+
+    def evaluate(self, partner, packages):
+        results = []
+        for outgoing, incoming in packages:
+            if (self.unchanged(self.team, partner, outgoing, incoming)
+                    and self.unchanged(partner, self.team, incoming, outgoing)):
+                continue
+            delta, lineup = self.side(self.team, partner, outgoing, incoming)
+            partner_delta, partner_lineup = self.side(partner, self.team,
+                                                      incoming, outgoing)
+            if delta == 0 and partner_delta == 0:
+                continue
+            results.append((partner, outgoing, incoming, delta, partner_delta,
+                            lineup, partner_lineup))
+        return results
+
+    def lineup(self, team, partner, outgoing, incoming, assignment):
+        roster = self.rosters[team]
+        players = ([p for i, p in enumerate(roster.players) if i not in outgoing]
+                   + [self.rosters[partner].players[i] for i in incoming])
+        positions = {p: 'IL' if roster.positions.get(p) == 'IL' else 'BN'
+                     for p in players}
+        for s, i in enumerate(assignment):
+            if i >= 0:
+                positions[players[i]] = STARTING_SLOTS[s]
+        return Roster(players, positions)
+
+def trade_task(partner, packages):
+    return worker_state().evaluate(partner, packages)
+
+class TradeSearch(WorkerPool):
+
+    def __init__(self, state, processes=None):
+        super(TradeSearch, self).__init__(state, processes=processes)
+
+    def search(self, max_size=2, chunk_size=256):
+        tasks = []
+        for partner in range(len(self.state.rosters)):
+            if partner == self.state.team:
+                continue
+            packages = self.state.packages(partner, max_size=max_size)
+            while True:
+                chunk = list(itertools.islice(packages, chunk_size))
+                if len(chunk) == 0:
+                    break
+                tasks.append((partner, chunk))
+        results = self.starmap(trade_task, tasks)
+        return [trade for chunk in results for trade in chunk]
+
+def league_scores(scorers, rosters, exclude, metric='winning_probability'):
+    if not isinstance(scorers, dict):
+        scorers = dict(enumerate(scorers))
+    scorers = {j: scorer for j, scorer in scorers.items() if j not in exclude}
+    columns = [next(iter(scorers.values())).columns(roster) for roster in rosters]
+    scores = [METRICS[metric](scorer.score_columns(columns)[1]).mean(axis=-1)
+              for scorer in scorers.values()]
+    return np.mean(scores, axis=0)
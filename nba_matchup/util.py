@@ -1,4 +1,4 @@
-from collections import defaultdict
+import itertools
 import matplotlib.pyplot as plt
 import seaborn as sns
 from tabulate import tabulate
@@ -19,58 +19,78 @@ TEAM_COUNT = {
     'BN': 0,
 }
 
-def valid_starters(players):
-    def generate_roster(players, counts, num_slots):
-        if num_slots == 0:
+def augment(player, slots, matching, seen):
+    for i, slot in enumerate(slots):
+        if i in seen or slot not in player.eligible_positions:
+            continue
+        seen.add(i)
+        if matching[i] is None or augment(matching[i], slots, matching, seen):
+            matching[i] = player
+            return True
+    return False
+
+def max_matching(players, slots):
+    matching = [None] * len(slots)
+    return sum(augment(player, slots, matching, set()) for player in players)
+
+def valid_starters(players, team=TEAM_COUNT, ignore_players=set(),
+                   ignore_injured=False):
+    players = [p for p in players if p not in ignore_players
+               and not (ignore_injured and p.status == 'INJ')]
+    counts = {slot: count for slot, count in team.items() if count > 0}
+    slot_types = sorted(counts, key=lambda slot: (
+        sum(slot in p.eligible_positions for p in players), slot))
+    def generate_roster(slot_index, remaining):
+        if slot_index == len(slot_types):
             yield {}
-        for player in players:
-            for eligible_position in player.eligible_positions:
-                if counts[eligible_position] > 0:
-                    new_players = players.copy()
-                    new_players.remove(player)
-                    new_counts = counts.copy()
-                    new_counts[eligible_position] -= 1
-                    for remaining_roster in generate_roster(new_players,
-                                                            new_counts,
-                                                            num_slots - 1):
-                        yield {player: eligible_position, **remaining_roster}
-    for roster in tqdm.tqdm(generate_roster(players, TEAM_COUNT.copy(),
-                                            sum(TEAM_COUNT.values()))):
+            return
+        remaining_slots = [slot for slot in slot_types[slot_index:]
+                           for _ in range(counts[slot])]
+        if max_matching(remaining, remaining_slots) < len(remaining_slots):
+            return
+        slot = slot_types[slot_index]
+        eligible = [p for p in remaining if slot in p.eligible_positions]
+        for chosen in itertools.combinations(eligible, counts[slot]):
+            rest = [p for p in remaining if p not in chosen]
+            for roster in generate_roster(slot_index + 1, rest):
+                yield {**{p: slot for p in chosen}, **roster}
+    for roster in tqdm.tqdm(generate_roster(0, players)):
         yield roster
 
 def visualize_matchup(teams, opponent, show_plots=True, **kwargs):
-    from .sim import simulate_h2h, CATEGORY_NAMES
-    num_samples = kwargs.get('num_samples', 1000)
+    from .sim import simulate_summary, CATEGORY_NAMES
     week = kwargs.get('week', None)
     fig, ax = plt.subplots(1, 2)
     bar_width = 0.35
     projections = []
     for i, team in enumerate(teams):
         print("===========================================")
-        cats, points, scores, projection = simulate_h2h(team.roster(week=week),
-                                opponent.roster(week=week), **kwargs)
-        print("%s's expected score: %f +/- %f" % (team.manager_name, points.mean(), points.std()))
+        summary = simulate_summary(team.roster(week=week),
+                                   opponent.roster(week=week), **kwargs)
+        print("%s's expected score: %f +/- %f" % (team.manager_name,
+                                                 summary.expected_points,
+                                                 summary.points_std))
         print("Expected categories:")
-        means = cats.mean(axis=1)
-        unique, nums = np.unique(points, return_counts=True)
-        counts = defaultdict(int)
-        counts.update(dict(zip(unique, nums)))
-        winning_prob = sum([counts[p] for p in range(5, 10)]) / num_samples
-        probs = np.concatenate([
-            (cats[0, ..., :-1] > cats[1, ..., :-1]).mean(axis=0),
-            (cats[0, ..., -1:] < cats[1, ..., -1:]).mean(axis=0),
-        ])
+        means = summary.category_means
+        probs = summary.category_probabilities
         table = [["", team.manager_name, opponent.manager_name]]
         for j, cat in enumerate(CATEGORY_NAMES):
             table.append([cat] + list(means[:, j]) + [probs[..., j]])
         print(tabulate(table))
+        if summary.sketch is not None:
+            low, median, high = summary.quantiles([0.1, 0.5, 0.9])
+            print("Category quantiles (10%, 50%, 90%):")
+            table = [["", team.manager_name, opponent.manager_name]]
+            for j, cat in enumerate(CATEGORY_NAMES):
+                table.append([cat] + ["%.3f / %.3f / %.3f" % (low[k, j], median[k, j], high[k, j])
+                                      for k in range(2)])
+            print(tabulate(table))
         print("%s has a %f chance of beating %s" % (
             team.manager_name,
-            winning_prob,
+            summary.win_probability,
             opponent.manager_name,
         ))
-        ax[0].bar(np.arange(10) + i * bar_width, [counts[p] / num_samples for p
-                                                  in range(10)], 0.1, align='center',
+        ax[0].bar(np.arange(10) + i * bar_width, summary.point_probabilities, 0.1, align='center',
                     alpha=0.5, label='%s-%u' % (team.manager_name, i))
         ax[0].set_xlabel("Score")
         ax[0].set_xticks(np.arange(10) + bar_width / 2)
@@ -88,7 +108,7 @@ def visualize_matchup(teams, opponent, show_plots=True, **kwargs):
         ax[1].set_ylabel("Probability of Winning")
         ax[1].set_ylim([0, 1])
         ax[1].set_title("%s vs. %s Simulation" % (team.manager_name, opponent.manager_name))
-        projections.append(projection)
+        projections.append(summary.projections)
     ax[0].legend(loc='best')
     ax[1].legend(loc='best')
     if show_plots:
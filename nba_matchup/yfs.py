@@ -1,19 +1,38 @@
 from yaspin import yaspin
 import datetime
-from yahoo_oauth import OAuth2
-from fantasy_sport import FantasySport
 
-__all__ = ['yfs', 'LEAGUE_KEY', 'CURRENT_WEEK', 'START_DATE']
+from .replay import ReplayClient, recording, replaying, today
+from .store import LEAGUE_METADATA
+
+__all__ = ['yfs', 'auth_headers', 'LEAGUE_KEY', 'CURRENT_WEEK', 'END_WEEK', 'START_DATE']
 
 LEAGUE_KEY = "nba.l.64384"
 
-oauth = OAuth2(None, None, from_file='oauth.json', base_url='https://fantasysports.yahooapis.com/fantasy/v2/')
-yfs = FantasySport(oauth, fmt='json')
+if replaying():
+    yfs = ReplayClient(None, 'yfs')
+else:
+    from yahoo_oauth import OAuth2
+    from fantasy_sport import FantasySport
+    oauth = OAuth2(None, None, from_file='oauth.json', base_url='https://fantasysports.yahooapis.com/fantasy/v2/')
+    yfs = FantasySport(oauth, fmt='json')
+    if recording():
+        yfs = ReplayClient(yfs, 'yfs')
+
+def auth_headers():
+    if replaying():
+        return {}
+    if not oauth.token_is_valid():
+        oauth.refresh_access_token()
+    return {'Authorization': 'Bearer %s' % oauth.access_token}
+
+def fetch_league():
+    with yaspin(text="Fetching league data", color='cyan'):
+        return yfs.get_leagues([LEAGUE_KEY]).json()
 
-with yaspin(text="Fetching league data", color='cyan'):
-    response = yfs.get_leagues([LEAGUE_KEY]).json()['fantasy_content']['leagues']['0']['league'][0]
+response = LEAGUE_METADATA.cached('league', LEAGUE_KEY, fetch_league)['fantasy_content']['leagues']['0']['league'][0]
 START_DATE = datetime.datetime.strptime(response['start_date'], "%Y-%m-%d").date()
 while START_DATE.weekday() != 0:
     START_DATE -= datetime.timedelta(days=1)
-diff = datetime.datetime.today().date() - START_DATE
+diff = today() - START_DATE
 CURRENT_WEEK = response.get('current_week', None)
+END_WEEK = response.get('end_week', None)
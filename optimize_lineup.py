@@ -10,7 +10,7 @@ from tabulate import tabulate
 import logging
 logging.basicConfig()
 logging.getLogger().setLevel(logging.INFO)
-from nba_matchup import get_league, simulate_h2h, CURRENT_WEEK, hill_climb, visualize_matchup, get_free_agents, simulated_annealing
+from nba_matchup import get_league, simulate_h2h, CURRENT_WEEK, hill_climb, visualize_matchup, get_free_agents, simulated_annealing, SampleBank, H2HScorer, AdaptiveScore, MetricScore, CompactRoster, CachedScore, AnalyticScorer, AnalyticScore, confirm, daily_teams, print_daily_lineups, week_start, brute_force, ScorePool, PoolScore
 league = get_league()
 
 def winning_prob(cats, points, scores, num_samples):
@@ -34,8 +34,22 @@ def ev(cats, points, scores, num_samples):
 @click.option('--half_life', type=float, default=14)
 @click.option('--metric', type=str, default='winning_probability')
 @click.option('--ignore_injured', is_flag=True)
+@click.option('--sample_bank/--no_sample_bank', default=True)
+@click.option('--adaptive/--no-adaptive', default=False)
+@click.option('--batch_size', type=int, default=2000)
+@click.option('--sample_budget', type=int, default=None)
+@click.option('--num_proposals', type=int, default=1)
+@click.option('--cache_size', type=int, default=10000)
+@click.option('--analytic', is_flag=True)
+@click.option('--verify/--no_verify', default=True)
+@click.option('--dtype', type=click.Choice(['float64', 'float32', 'int16']), default='float64')
+@click.option('--daily', is_flag=True)
+@click.option('--exhaustive', is_flag=True)
+@click.option('--processes', type=int, default=None)
 def main(team1, team2, num_days, num_samples, week, num_fa, num_iters,
-         ignore_player, half_life, metric, ignore_injured):
+         ignore_player, half_life, metric, ignore_injured, sample_bank,
+         adaptive, batch_size, sample_budget, num_proposals,
+         cache_size, analytic, verify, dtype, daily, exhaustive, processes):
     league = get_league()
     decay_rate = np.log(2) / half_life
     # if week == 19: week = 18
@@ -59,17 +73,21 @@ def main(team1, team2, num_days, num_samples, week, num_fa, num_iters,
         metric_fn = ev
     else:
         metric_fn = winning_prob
+    dtype = np.dtype(dtype).type
+    bank = SampleBank(num_samples, dtype=dtype) if sample_bank or adaptive else None
+    scorer = H2HScorer(team2.roster(week=week),
+                       num_days=num_days, num_samples=num_samples,
+                       week=week, decay_rate=decay_rate,
+                       sample_bank=bank, dtype=dtype)
     def roster_score(roster):
-        cats, points, scores, _ = simulate_h2h(roster,
-                            team2.roster(week=week),
-                            num_days=num_days, num_samples=num_samples,
-                            week=week, decay_rate=decay_rate)
+        cats, points, scores, _ = scorer(roster)
         return metric_fn(cats, points, scores, num_samples)
     def reverse_roster_score(roster):
         cats, points, scores, _ = simulate_h2h(roster,
                             team1.roster(week=week),
                             num_days=num_days, num_samples=num_samples,
-                            week=week, decay_rate=decay_rate)
+                            week=week, decay_rate=decay_rate,
+                            sample_bank=bank, dtype=dtype)
         return metric_fn(cats, points, scores, num_samples)
     print("%s's roster:" % team1.manager_name, roster_score(team1.roster(week=week)))
     print(tabulate([
@@ -81,6 +99,23 @@ def main(team1, team2, num_days, num_samples, week, num_fa, num_iters,
         [position, player.name] for player, position in
         team2.roster(week=week).positions.items() if position not in {"BN", "IL"}
     ]))
+    if daily:
+        roster = team1.roster(week=week)
+        for agent in get_free_agents(num_fa):
+            roster = roster.add(agent, "BN")
+        team1.set_roster(roster, week=week)
+        base = week_start(week)
+        teams = daily_teams(roster, team2.roster(week=week), base,
+                            num_days=num_days, decay_rate=decay_rate)
+        for team, (_, _, _, slots) in zip([team1, team2], teams):
+            print("===========================================")
+            print("%s's daily lineups:" % team.manager_name)
+            print_daily_lineups(team.roster(week=week), slots, base)
+        visualize_matchup([team1], team2,
+                          num_days=num_days, num_samples=num_samples,
+                          week=week, decay_rate=decay_rate, dtype=dtype,
+                          daily=True, show_plots=False)
+        return
     print("Optimizing %s's lineup" % team1.manager_name)
     print("===========================================")
     roster = team1.roster(week=week)
@@ -89,17 +124,63 @@ def main(team1, team2, num_days, num_samples, week, num_fa, num_iters,
     for agent in get_free_agents(num_fa):
         print(agent.name)
         roster = roster.add(agent, "BN")
-    team1.set_roster(roster)
+    roster = CompactRoster.from_roster(roster)
+    team1.set_roster(roster, week=week)
     print("Ignoring players:", ", ".join(ignore_player))
+    metric_name = 'ev' if metric == 'ev' else 'winning_probability'
+    if analytic:
+        metric_score = AnalyticScore(AnalyticScorer(team2.roster(week=week), week=week,
+                                                    num_days=num_days,
+                                                    decay_rate=decay_rate),
+                                     metric=metric_name)
+    elif adaptive:
+        metric_score = AdaptiveScore(scorer, metric=metric_name,
+                                     batch_size=batch_size, budget=sample_budget)
+    else:
+        metric_score = MetricScore(scorer, metric=metric_name)
+    pool = None
+    if exhaustive and not analytic:
+        if bank is None:
+            raise click.BadParameter("exhaustive search requires a sample bank",
+                                     param_hint='--no_sample_bank')
+        pool = ScorePool([scorer], rosters=[roster], processes=processes)
+        metric_score = PoolScore(pool, metric=metric_name)
+    optimizer_score = CachedScore(metric_score, max_size=cache_size,
+                                  params=(week, num_days, decay_rate, num_samples))
+    start_roster = roster
     scores = []
-    for roster, score in simulated_annealing(roster, roster_score, ignore_players={team1.roster(week=week).player_by_name(n) for n in ignore_player},
-                                    num_steps=num_iters,
-                                    ignore_injured=ignore_injured):
-        scores.append(score)
-        # print(tabulate([
-            # [position, player.name] for player, position in
-            # roster.positions.items() if position not in {"BN", "IL"}
-        # ]))
+    ignore_players = {team1.roster(week=week).player_by_name(n) for n in ignore_player}
+    if exhaustive:
+        search = brute_force(roster, optimizer_score, ignore_players=ignore_players,
+                             ignore_injured=ignore_injured)
+    else:
+        search = simulated_annealing(roster, optimizer_score, ignore_players=ignore_players,
+                                     num_steps=num_iters,
+                                     ignore_injured=ignore_injured,
+                                     num_proposals=num_proposals)
+    try:
+        for roster, score in search:
+            scores.append(score)
+            # print(tabulate([
+                # [position, player.name] for player, position in
+                # roster.positions.items() if position not in {"BN", "IL"}
+            # ]))
+    finally:
+        if pool is not None:
+            pool.close()
+    if analytic and verify:
+        print("Analytic score:", score)
+        optimized_roster = roster
+        roster, score = confirm(MetricScore(scorer, metric=metric_name),
+                                roster, start_roster)
+        print("Monte Carlo score:", score)
+        if roster is not optimized_roster:
+            print("The optimized lineup scores worse in simulation; keeping the starting lineup")
+    if adaptive and not analytic:
+        print("Spent %.0f samples per candidate (budget %u)" % (
+            metric_score.samples_spent / max(metric_score.num_evaluations, 1),
+            metric_score.budget))
+    print("Score cache:", optimizer_score)
     print("%s's optimized roster:" % team1.manager_name, score)
     print(tabulate([
         [position, player.name] for player, position in
@@ -108,12 +189,12 @@ def main(team1, team2, num_days, num_samples, week, num_fa, num_iters,
 
     def team_generator():
         for r in [old_roster, roster]:
-            team1.set_roster(r)
+            team1.set_roster(r, week=week)
             yield team1
 
     projections = visualize_matchup(team_generator(), team2,
                       num_days=num_days, num_samples=100000,
-                      week=week, decay_rate=decay_rate,
+                      week=week, decay_rate=decay_rate, dtype=dtype,
                                     show_plots=False)
     with pd.option_context('display.max_rows', None, 'display.max_columns',
                            None, 'display.expand_frame_repr', False):
@@ -0,0 +1,46 @@
+import numpy as np
+import click
+from tabulate import tabulate
+import logging
+logging.basicConfig()
+logging.getLogger().setLevel(logging.INFO)
+from nba_matchup import get_league, simulate_season, CURRENT_WEEK, END_WEEK
+
+@click.command()
+@click.option('--num_days', type=int, default=30)
+@click.option('--num_seasons', type=int, default=10000)
+@click.option('--first_week', type=int, default=CURRENT_WEEK)
+@click.option('--last_week', type=int, default=END_WEEK)
+@click.option('--half_life', type=float, default=14)
+@click.option('--num_playoff', type=int, default=6)
+@click.option('--chunk_size', type=int, default=1000)
+@click.option('--ignore_standings', is_flag=True)
+@click.option('--dtype', type=click.Choice(['float64', 'float32', 'int16']), default='float64')
+def main(num_days, num_seasons, first_week, last_week, half_life, num_playoff,
+         chunk_size, ignore_standings, dtype):
+    if last_week is None:
+        raise click.BadParameter("the league's last week is unknown", param_hint='--last_week')
+    league = get_league()
+    decay_rate = np.log(2) / half_life
+    teams = league.teams
+    weeks = list(range(int(first_week), int(last_week) + 1))
+    wins = None if ignore_standings else league.standings()
+    summary = simulate_season([team.roster(week=first_week) for team in teams],
+                              league.schedule(weeks), week=first_week,
+                              num_days=num_days, num_seasons=num_seasons,
+                              decay_rate=decay_rate, wins=wins,
+                              num_playoff=num_playoff, chunk_size=chunk_size,
+                              dtype=np.dtype(dtype).type)
+    wins = np.zeros(len(teams)) if wins is None else np.asarray(wins)
+    order = np.argsort(-summary.expected_wins)
+    print("Playoff odds (weeks %u-%u, %u seasons)" % (weeks[0], weeks[-1], num_seasons))
+    print(tabulate([
+        [teams[i].manager_name, wins[i], summary.expected_wins[i],
+         summary.expected_rank[i], summary.playoff_probabilities[i],
+         summary.rank_probabilities[i, 0]]
+        for i in order
+    ], headers=["Manager", "Wins", "Projected wins", "Projected rank", "Playoffs",
+                "First"], floatfmt=".3f"))
+
+if __name__ == "__main__":
+    main()
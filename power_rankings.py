@@ -0,0 +1,39 @@
+import numpy as np
+import click
+from tabulate import tabulate
+import logging
+logging.basicConfig()
+logging.getLogger().setLevel(logging.INFO)
+from nba_matchup import get_league, league_matrix, CURRENT_WEEK, CATEGORY_NAMES
+
+@click.command()
+@click.option('--num_days', type=int, default=30)
+@click.option('--num_samples', type=int, default=50000)
+@click.option('--week', type=int, default=CURRENT_WEEK)
+@click.option('--half_life', type=float, default=14)
+@click.option('--chunk_size', type=int, default=10000)
+@click.option('--dtype', type=click.Choice(['float64', 'float32', 'int16']), default='float64')
+def main(num_days, num_samples, week, half_life, chunk_size, dtype):
+    league = get_league()
+    decay_rate = np.log(2) / half_life
+    teams = league.teams
+    win_probability, category_probabilities = league_matrix(
+        [team.roster(week=week) for team in teams], week=week,
+        num_days=num_days, num_samples=num_samples, decay_rate=decay_rate,
+        chunk_size=chunk_size, dtype=np.dtype(dtype).type)
+    average = np.nanmean(win_probability, axis=1)
+    categories = np.nanmean(category_probabilities, axis=1)
+    order = np.argsort(-average)
+    print("Power rankings (week %u)" % week)
+    print(tabulate([
+        [rank + 1, teams[i].manager_name, average[i], categories[i].sum()]
+        + list(categories[i]) for rank, i in enumerate(order)
+    ], headers=["", "Manager", "Win %", "Cats"] + CATEGORY_NAMES, floatfmt=".3f"))
+    print("Head to head win probabilities (row beats column)")
+    print(tabulate([
+        [teams[i].manager_name] + list(win_probability[i, order])
+        for i in order
+    ], headers=[""] + [teams[i].manager_name for i in order], floatfmt=".3f"))
+
+if __name__ == "__main__":
+    main()
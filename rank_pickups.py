@@ -0,0 +1,48 @@
+import numpy as np
+import click
+from tabulate import tabulate
+import logging
+logging.basicConfig()
+logging.getLogger().setLevel(logging.INFO)
+from nba_matchup import get_league, get_free_agents, rank_pickups, CURRENT_WEEK
+
+@click.command()
+@click.option('--team1', type=str, default=None)
+@click.option('--team2', type=str, default=None)
+@click.option('--num_days', type=int, default=30)
+@click.option('--num_samples', type=int, default=20000)
+@click.option('--week', type=int, default=CURRENT_WEEK)
+@click.option('--half_life', type=float, default=14)
+@click.option('--num_fa', type=int, default=200)
+@click.option('--num_results', type=int, default=20)
+@click.option('--num_checks', type=int, default=40)
+@click.option('--metric', type=str, default='winning_probability')
+@click.option('--batch_size', type=int, default=16)
+@click.option('--dtype', type=click.Choice(['float64', 'float32', 'int16']), default='float64')
+def main(team1, team2, num_days, num_samples, week, half_life, num_fa,
+         num_results, num_checks, metric, batch_size, dtype):
+    league = get_league()
+    decay_rate = np.log(2) / half_life
+    if team1 is None:
+        team1 = league.current_team
+    else:
+        team1 = league.team_by_owner(team1)
+    if team2 is None:
+        team2 = league.get_matchup(team1, week=week)
+    else:
+        team2 = league.team_by_owner(team2)
+    agents = list(get_free_agents(num_fa))
+    print("Ranking %u pickups for %s against %s" % (
+        len(agents) * len(team1.roster(week=week).players), team1.manager_name,
+        team2.manager_name))
+    pickups = rank_pickups(team1.roster(week=week), agents, team2.roster(week=week),
+                           week=week, num_days=num_days, decay_rate=decay_rate,
+                           num_samples=num_samples, metric=metric,
+                           batch_size=batch_size, num_checks=num_checks, dtype=np.dtype(dtype).type)
+    print(tabulate([
+        [add.name, drop.name, delta, simulated]
+        for add, drop, delta, simulated in pickups[:num_results]
+    ], headers=["Add", "Drop", "Change", "Simulated change"], floatfmt=".3f"))
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,10 @@ league = get_league()
 @click.option('--num_samples', type=int, default=50000)
 @click.option('--week', type=int, default=CURRENT_WEEK)
 @click.option('--half_life', type=float, default=14)
-def main(team1, team2, num_days, num_samples, week, half_life):
+@click.option('--chunk_size', type=int, default=None)
+@click.option('--quantiles', is_flag=True)
+def main(team1, team2, num_days, num_samples, week, half_life, chunk_size,
+         quantiles):
     league = get_league()
     decay_rate = np.log(2) / half_life
     print(tabulate([["Team", "Manager"]] + [[t.name, t.manager_name] for t in league.teams]))
@@ -38,7 +41,8 @@ def main(team1, team2, num_days, num_samples, week, half_life):
     print("Roster:")
     print_roster(team2.roster(week=week))
     projections = visualize_matchup([team1], team2, num_days=num_days, num_samples=num_samples,
-                      week=week, decay_rate=decay_rate)
+                      week=week, decay_rate=decay_rate,
+                      chunk_size=chunk_size, quantiles=quantiles)
     #print(projections[0][0].round(2).to_csv())
     print("Projections")
     print("=====================")
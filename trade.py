@@ -1,5 +1,3 @@
-from multiprocessing import Pool
-from functools import partial
 from collections import defaultdict
 import numpy as np
 import datetime
@@ -9,45 +7,51 @@ from tabulate import tabulate
 import logging
 logging.basicConfig()
 logging.getLogger().setLevel(logging.INFO)
-from nba_matchup import get_league, visualize_matchup, CURRENT_WEEK, print_roster, START_DATE, CATEGORY_NAMES, hill_climb, simulate_h2h, brute_force
+from nba_matchup import get_league, visualize_matchup, CURRENT_WEEK, print_roster, START_DATE, CATEGORY_NAMES, hill_climb, simulate_h2h, brute_force, SampleBank, H2HScorer, ScorePool, TradeState, TradeSearch, league_scores
 league = get_league()
 
-def winning_prob(cats, points, scores, num_samples):
-    unique, nums = np.unique(points, return_counts=True)
-    counts = defaultdict(int)
-    counts.update(dict(zip(unique, nums)))
-    return sum([counts[p] for p in range(5, 10)]) / num_samples
+def score_team(pool, roster, teams_to_eval):
+    results = pool.climb([(i, roster) for i in range(len(teams_to_eval))],
+                         ignore_players=set(), ignore_injured=True, num_steps=100)
+    return {k: score for k, (_, score) in zip(teams_to_eval, results)}
 
-def ev(cats, points, scores, num_samples):
-    return points.mean()
-
-def roster_score(other_roster, num_days, num_samples, week, decay_rate, roster):
-    cats, points, scores, _ = simulate_h2h(roster,
-                        other_roster,
-                        num_days=num_days, num_samples=num_samples,
-                        week=week, decay_rate=decay_rate)
-    means = cats.mean(axis=1)
+def search_trades(league, team, num_days, num_samples, week, decay_rate,
+                  max_size, num_results, min_partner_delta, processes, dtype,
+                  check_samples):
+    teams = league.teams
+    me = teams.index(team)
+    state = TradeState([t.roster(week=week) for t in teams], me, week=week,
+                       num_days=num_days, decay_rate=decay_rate)
+    with TradeSearch(state, processes=processes) as search:
+        trades = search.search(max_size=max_size)
+    trades = sorted([t for t in trades if t[4] >= min_partner_delta],
+                    key=lambda t: -t[3])[:num_results]
+    opponents = sorted({j for t in trades for j in range(len(teams)) if j not in {me, t[0]}})
+    partners = {t[0] for t in trades}
+    bank = SampleBank(check_samples, dtype=dtype,
+                      capacity=sum(len(state.rosters[j].players)
+                                   for j in set(opponents) | partners | {me}))
+    scorers = {j: H2HScorer(state.rosters[j], num_days=num_days,
+                            num_samples=check_samples, week=week,
+                            decay_rate=decay_rate, sample_bank=bank, dtype=dtype)
+               for j in opponents}
     table = []
-    probs = np.concatenate([
-        (cats[0, ..., :-1] > cats[1, ..., :-1]).mean(axis=0),
-        (cats[0, ..., -1:] < cats[1, ..., -1:]).mean(axis=0),
-    ])
-    for j, cat in enumerate(CATEGORY_NAMES):
-        table.append([cat] + list(means[:, j]) + [probs[..., j]])
-    result = winning_prob(cats, points, scores, num_samples)
-    return result
-
-def matchup(roster, roster_score, num_days, num_samples, week, decay_rate, other_roster):
-    for roster, score in hill_climb(roster, partial(roster_score, other_roster, num_days, num_samples, week, decay_rate), ignore_players={}, ignore_injured=True, num_steps=100):
-        pass
-    return score
-
-def score_team(roster, teams_to_eval,
-               num_days, num_samples, week, decay_rate):
-    other_rosters = [t.roster(week=week) for t in teams_to_eval]
-    pool = Pool(len(teams_to_eval))
-    scores = pool.map(partial(matchup, roster, roster_score, num_days, num_samples, week, decay_rate), other_rosters)
-    return {k:v for k, v in zip(teams_to_eval, scores)}
+    for partner, outgoing, incoming, delta, partner_delta, lineup, partner_lineup in trades:
+        sides = []
+        for side, other, give, get, assignment in [
+                (me, partner, outgoing, incoming, lineup),
+                (partner, me, incoming, outgoing, partner_lineup)]:
+            rosters = [state.lineup(side, other, give, get, assignment),
+                       state.lineup(side, other, (), (), state.base[side, other][0])]
+            new, old = league_scores(scorers, rosters, {side, other})
+            sides.append(new - old)
+        table.append([teams[partner].manager_name,
+                      ", ".join(state.rosters[me].players[i].name for i in outgoing),
+                      ", ".join(state.rosters[partner].players[i].name for i in incoming),
+                      delta, partner_delta] + sides)
+    print(tabulate(table, headers=["Partner", "Give", "Get", "Change", "Partner change",
+                                   "Simulated change", "Simulated partner change"],
+                   floatfmt=".3f"))
 
 @click.command()
 @click.option('--team1', type=str, default=None)
@@ -59,15 +63,30 @@ def score_team(roster, teams_to_eval,
 @click.option('--player1', type=str, multiple=True)
 @click.option('--player2', type=str, multiple=True)
 @click.option('--eval_team', type=str, multiple=True)
-def main(team1, team2, num_days, num_samples, week, half_life, player1, player2, eval_team):
+@click.option('--search', is_flag=True)
+@click.option('--max_size', type=int, default=2)
+@click.option('--num_results', type=int, default=20)
+@click.option('--min_partner_delta', type=float, default=0.)
+@click.option('--processes', type=int, default=None)
+@click.option('--check_samples', type=int, default=10000)
+@click.option('--dtype', type=click.Choice(['float64', 'float32', 'int16']), default='float64')
+def main(team1, team2, num_days, num_samples, week, half_life, player1, player2, eval_team,
+         search, max_size, num_results, min_partner_delta, processes, dtype,
+         check_samples):
     player1_name, player2_name = team1, team2
     decay_rate = np.log(2) / half_life
+    dtype = np.dtype(dtype).type
     league = get_league()
     print(tabulate([["Team", "Manager"]] + [[t.name, t.manager_name] for t in league.teams]))
     if team1 is None:
         team1 = league.current_team
     else:
         team1 = league.team_by_owner(team1)
+    if search:
+        search_trades(league, team1, num_days, num_samples, week, decay_rate,
+                      max_size, num_results, min_partner_delta, processes, dtype,
+                      check_samples)
+        return
     if team2 is None:
         team2 = league.get_matchup(team1, week=week)
     else:
@@ -101,24 +120,31 @@ def main(team1, team2, num_days, num_samples, week, half_life, player1, player2,
         player = new_team2_roster.player_by_name(p)
         new_team2_roster = new_team2_roster.remove(player)
         new_team1_roster = new_team1_roster.add(player, 'BN')
-    team1.set_roster(new_team1_roster)
+    team1.set_roster(new_team1_roster, week=week)
     print_roster(new_team1_roster, include_bench=True, include_injured=True)
     print_roster(new_team2_roster, include_bench=True, include_injured=True)
     other_players = [team.roster(week=week) for team in league.teams if team.manager_name not in {player1_name, player2_name}]
     teams_to_eval = [league.team_by_owner(name) for name in eval_team]
-    print("Evaluating %s" % team1.manager_name)
-    old_team1_scores = score_team(team1_roster, teams_to_eval, num_days, num_samples, week, decay_rate)
-    team1_scores = score_team(new_team1_roster, teams_to_eval, num_days, num_samples, week, decay_rate)
-    improvements = [team1_scores[k] - old_team1_scores[k] for k in old_team1_scores]
-    print(tabulate([[k.manager_name, old_team1_scores[k], team1_scores[k], team1_scores[k] - old_team1_scores[k]] for k in old_team1_scores]))
-    print("Average improvement:", np.mean(improvements))
+    bank = SampleBank(num_samples, dtype=dtype)
+    scorers = [H2HScorer(t.roster(week=week), num_days=num_days,
+                         num_samples=num_samples, week=week,
+                         decay_rate=decay_rate, sample_bank=bank, dtype=dtype)
+               for t in teams_to_eval]
+    rosters = [team1_roster, new_team1_roster, team2_roster, new_team2_roster]
+    with ScorePool(scorers, rosters=rosters) as pool:
+        print("Evaluating %s" % team1.manager_name)
+        old_team1_scores = score_team(pool, team1_roster, teams_to_eval)
+        team1_scores = score_team(pool, new_team1_roster, teams_to_eval)
+        improvements = [team1_scores[k] - old_team1_scores[k] for k in old_team1_scores]
+        print(tabulate([[k.manager_name, old_team1_scores[k], team1_scores[k], team1_scores[k] - old_team1_scores[k]] for k in old_team1_scores]))
+        print("Average improvement:", np.mean(improvements))
 
-    print("Evaluating %s" % team2.manager_name)
-    old_team2_scores = score_team(team2_roster, teams_to_eval, num_days, num_samples, week, decay_rate)
-    team2_scores = score_team(new_team2_roster, teams_to_eval, num_days, num_samples, week, decay_rate)
-    improvements = [team2_scores[k] - old_team2_scores[k] for k in old_team2_scores]
-    print(tabulate([[k.manager_name, old_team2_scores[k], team2_scores[k], team2_scores[k] - old_team2_scores[k]] for k in old_team2_scores]))
-    print("Average improvement:", np.mean(improvements))
+        print("Evaluating %s" % team2.manager_name)
+        old_team2_scores = score_team(pool, team2_roster, teams_to_eval)
+        team2_scores = score_team(pool, new_team2_roster, teams_to_eval)
+        improvements = [team2_scores[k] - old_team2_scores[k] for k in old_team2_scores]
+        print(tabulate([[k.manager_name, old_team2_scores[k], team2_scores[k], team2_scores[k] - old_team2_scores[k]] for k in old_team2_scores]))
+        print("Average improvement:", np.mean(improvements))
 
 if __name__ == "__main__":
     main()